@@ -0,0 +1,226 @@
+WordleBenchBanner = 'WordleBench.py v1.0 GnuGPL3 Copyright (c) 2022 David Spaughton'
+
+"""
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without
+even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with this program.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+"""
+Benchmarks WordleSolver.py by playing a whole game for every answer.
+
+Each game guesses the top suggestion and gets its hint from MakeHint.
+The results (times per game and per turn, the hints the engines
+computed or looked up, peak memory and how many guesses the games
+took) are written as JSON,
+and can be compared against an earlier run to catch regressions.
+
+usage: WordleBench.py [-a ANSWERS] [-n COUNT] [-o FILE] [--compare BASELINE]
+"""
+
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+
+import WordleSolver as WS
+
+try:
+    import resource
+except ImportError: # not on windows
+    resource = None
+
+
+class HintCounter:
+    """Counts the hints (guess, candidate pairs) WordleSolver works out,
+    whichever engine does it: each wrapped function adds the number of
+    hints it computed or looked up in the matrix."""
+
+    def __init__(self):
+        self.Hints = 0
+        self.Wrapped = [] # (owner, name, the original function)
+
+    def Wrap(self,owner,name,hints):
+        # hints(args,result) is how many hints a call worked out
+        function = getattr(owner,name)
+        def Counted(*args,**kwargs):
+            result = function(*args,**kwargs)
+            self.Hints += hints(args,result)
+            return result
+        setattr(owner,name,Counted)
+        self.Wrapped.append((owner,name,function))
+
+    def Restore(self):
+        for owner,name,function in reversed(self.Wrapped):
+            setattr(owner,name,function)
+        self.Wrapped = []
+
+
+def CountHints():
+    # a HintCounter on every way WordleSolver gets hints
+    Counter = HintCounter()
+    Counter.Wrap(WS,'MakeHint',lambda args,result:1)
+    Counter.Wrap(WS,'MakeHintCode',lambda args,result:1)
+    Counter.Wrap(WS,'BatchHintCodes',lambda args,result:result.size)      # numpy engine
+    Counter.Wrap(WS.HintMatrix,'Codes',lambda args,result:result.size)    # matrix blocks
+    Counter.Wrap(WS,'RowCodes',lambda args,result:len(args[1]))           # matrix rows
+    Counter.Wrap(WS,'HintCounts',lambda args,result:len(args[1]))
+    return Counter
+
+
+def PeakMemory():
+    # peak resident memory in KB, if the platform says; else (windows)
+    # the peak traced by tracemalloc, which Run starts
+    if resource is None:
+        if not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.get_traced_memory()[1]//1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak//1024 if sys.platform=='darwin' else peak # macOS reports bytes
+
+
+def Percentile(Values,p):
+    if not Values:
+        return 0
+    Values = sorted(Values)
+    return Values[min(len(Values)-1,int(p*len(Values)))]
+
+
+def Run(Answers,FullList):
+    # play every answer, return the results dictionary
+    Counter = CountHints()
+    Games = []
+    Turns = []
+    if resource is None and not tracemalloc.is_tracing():
+        tracemalloc.start() # no resource module, so trace the peak instead
+    start = time.perf_counter()
+    try:
+        for answer in Answers:
+            Times = []
+            HintList = WS.PlayGame(answer,FullList,Times)
+            solved = bool(HintList) and HintList[-1][0]=='G'*len(answer)
+            Games.append({'answer':answer,'guesses':len(HintList),'solved':solved,
+                          'ms':round(1000*sum(Times),3)})
+            Turns.extend(Times)
+    finally:
+        Counter.Restore()
+    total = time.perf_counter()-start
+
+    GameMs = [G['ms'] for G in Games]
+    Spread = {}
+    for G in Games:
+        if G['solved']:
+            Spread[G['guesses']] = Spread.get(G['guesses'],0)+1
+    solved = sum(Spread.values())
+    Summary = {
+        'games': len(Games),
+        'failed': len(Games)-solved,
+        'seconds': round(total,3),
+        'game_ms_mean': round(sum(GameMs)/len(GameMs),3) if GameMs else 0,
+        'game_ms_p95': Percentile(GameMs,0.95),
+        'game_ms_max': max(GameMs,default=0),
+        'turn_ms_mean': round(1000*sum(Turns)/len(Turns),3) if Turns else 0,
+        'turn_ms_p95': round(1000*Percentile(Turns,0.95),3),
+        'guesses_mean': round(sum(n*k for n,k in Spread.items())/solved,4) if solved else 0,
+        'guesses': {str(n):Spread[n] for n in sorted(Spread)},
+        'hints': Counter.Hints,
+        'peak_kb': PeakMemory(),
+    }
+    return {'summary':Summary,'games':Games}
+
+
+# summary fields compared against a baseline: lower is better for all
+COMPARED = ['seconds','game_ms_mean','game_ms_p95','turn_ms_mean','turn_ms_p95',
+            'guesses_mean','failed','hints','peak_kb']
+NOISY = {'seconds','game_ms_mean','game_ms_p95','turn_ms_mean','turn_ms_p95','peak_kb'}
+
+def Compare(Baseline,Results,tolerance):
+    # print the changes since Baseline, return the regressed fields
+    Regressed = []
+    if Baseline['summary']['games']!=Results['summary']['games']:
+        print('(warning: the baseline played {:,d} games, this run {:,d})'.format(
+              Baseline['summary']['games'],Results['summary']['games']))
+    print('{:16s} {:>14s} {:>14s} {:>9s}'.format('','baseline','this run','change'))
+    for field in COMPARED:
+        old = Baseline['summary'].get(field)
+        new = Results['summary'].get(field)
+        if old is None or new is None:
+            continue
+        change = (new-old)/old if old else (0 if new==old else float('inf'))
+        # timings and memory are noisy, so they get some slack;
+        # the rest must not grow
+        worse = change>tolerance if field in NOISY else new>old
+        if worse:
+            Regressed.append(field)
+        print('{:16s} {:>14} {:>14} {:>+8.1%}{}'.format(field,old,new,change,' <-- worse' if worse else ''))
+    return Regressed
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Benchmark WordleSolver.py over whole games.')
+    parser.add_argument('-a','--answers',help='file of answers to play (default: FLW.txt)')
+    parser.add_argument('-n','--count',type=int,help='only play the first COUNT answers')
+    parser.add_argument('-o','--output',help='write the results to this JSON file')
+    parser.add_argument('--compare',help='compare with the results in this JSON file')
+    parser.add_argument('--tolerance',type=float,default=0.10,
+                        help='allowed growth in times and memory before it counts as a regression (default: 0.10)')
+    parser.add_argument('--cache',action='store_true',
+                        help='let games share the suggestion cache (default: every suggest is computed)')
+    args = parser.parse_args()
+
+    print(WordleBenchBanner)
+    start = time.perf_counter()
+    FullList = WS.LoadWordList()
+    WS.HintData = WS.LoadHintMatrix(FullList)
+    load = time.perf_counter()-start
+    Answers = FullList
+    if args.answers:
+        with open(args.answers) as file:
+            Answers = [line.strip().upper() for line in file if line.strip()]
+    if args.count is not None:
+        Answers = Answers[:args.count]
+    WS.SuggestMemo = WS.SuggestCache() if args.cache else None
+
+    print('playing {:,d} games ...'.format(len(Answers)))
+    Results = Run(Answers,FullList)
+    Results['meta'] = {
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': WS.np.__version__ if WS.np is not None else None,
+        'words': len(FullList),
+        'load_seconds': round(load,3),
+        'cache': args.cache,
+    }
+    Summary = Results['summary']
+    print('{:,d} games in {:.2f}s, {:.2f}ms per game, {:.2f}ms per turn, {:.4f} guesses on average.'.format(
+          Summary['games'],Summary['seconds'],Summary['game_ms_mean'],Summary['turn_ms_mean'],
+          Summary['guesses_mean']))
+    for n,count in Summary['guesses'].items():
+        print('{:>2s} guesses: {:6,d}'.format(n,count))
+    if Summary['failed']:
+        print('{:,d} games were not solved.'.format(Summary['failed']))
+
+    if args.output:
+        with open(args.output,'w') as file:
+            json.dump(Results,file,indent=1)
+        print('results saved to',args.output)
+
+    if args.compare:
+        with open(args.compare) as file:
+            Baseline = json.load(file)
+        Regressed = Compare(Baseline,Results,args.tolerance)
+        if Regressed:
+            print('regressions:',' '.join(Regressed))
+            sys.exit(1)
+        print('no regressions.')
@@ -0,0 +1,257 @@
+WordleServerBanner = 'WordleServer.py v1.0 GnuGPL3 Copyright (c) 2022 David Spaughton'
+
+"""
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without
+even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with this program.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+"""
+Serves WordleSolver.py to many users at once, over a line protocol.
+
+Each connection sends WordleSolver commands, one per line, and gets
+one JSON object back per line. A connection starts a new session;
+SESSION <id> switches to an existing one, e.g. after reconnecting.
+Commands are:
+    GUESS <word> <hint>     e.g. GUESS RAISE #Y###
+    WHATIF <word>
+    SUGGEST <number>
+    PATTERN <include> <omit> [page]
+    LIST [page]             all the candidates, or one page of 100
+    TABLE
+    UNDO                    take back the last guess
+    REDO                    put back the last guess undone
+    RESET                   start the session's game again
+    SESSION <id>
+    QUIT
+
+The word list, hint matrix and index are loaded once and shared by
+every session, which only holds its candidates (a bitset) and hints.
+Suggestions run in a process pool so they never stall the event loop.
+
+usage: WordleServer.py [--host HOST] [--port PORT] [--workers N]
+"""
+
+import os
+import json
+import asyncio
+import argparse
+import secrets
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import WordleSolver as WS
+
+MAX_SESSIONS = 10000 # the least recently used sessions are dropped beyond this
+
+
+class Session:
+    """One user's game: the candidates as an index bitset, the hints,
+    and their earlier values for UNDO and REDO."""
+
+    __slots__ = ('Bits','HintList','History')
+
+    def __init__(self,Bits):
+        self.Bits = Bits
+        self.HintList = []
+        self.History = WS.GameHistory()
+
+
+#==========================================================
+#   Suggestion workers, each with its own mapped hint data
+#==========================================================
+_WorkerList = None
+_WorkerIndex = None
+
+def _WorkerStart(filename):
+    # filename is the server's hint matrix file, or None if it has none
+    global _WorkerList,_WorkerIndex
+    if WS.HintData is None and filename is not None:
+        WS.HintData = WS.AttachHintMatrix(filename) # the server's copy, shared
+    _WorkerList = WS.HintData.Words if WS.HintData is not None else WS.LoadWordList()
+    _WorkerIndex = WS.WordIndex(_WorkerList)
+    WS.SuggestMemo = None # the server keeps the cache
+
+def _WorkerSuggest(Bits,limit):
+    return WS.Suggest(_WorkerIndex.List(Bits),_WorkerList,workers=1,limit=limit)
+
+
+class WordleServer:
+    """The shared word data and the sessions using it."""
+
+    def __init__(self,FullList,workers=1):
+        self.FullList = FullList
+        self.Index = WS.WordIndex(FullList)
+        self.Sessions = OrderedDict() # id -> Session
+        filename = WS.HintData.File if WS.HintData is not None else None
+        self.Pool = ProcessPoolExecutor(workers,initializer=_WorkerStart,initargs=(filename,))
+
+    def NewSession(self):
+        sid = secrets.token_hex(8)
+        self.Sessions[sid] = Session(self.Index.All)
+        while len(self.Sessions)>MAX_SESSIONS:
+            self.Sessions.popitem(last=False)
+        return sid
+
+    async def Handle(self,reader,writer):
+        sid = self.NewSession()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.decode('ascii','replace').strip()
+                if not line:
+                    continue
+                Z = line.upper().split()
+                if 'QUIT'==Z[0]:
+                    break
+                if 'SESSION'==Z[0]:
+                    sid,Reply = self.Attach(sid,line.split()[1:])
+                else:
+                    session = self.Sessions.get(sid)
+                    if session is None: # dropped as least recently used
+                        sid = self.NewSession()
+                        session = self.Sessions[sid]
+                    self.Sessions.move_to_end(sid)
+                    try:
+                        Reply = await self.Command(session,Z)
+                        Reply['ok'] = True
+                    except ValueError as E:
+                        Reply = {'ok':False,'error':str(E)}
+                writer.write((json.dumps(Reply)+'\n').encode('ascii'))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def Attach(self,sid,Z):
+        # SESSION [id]: report the session, or switch to another
+        if Z:
+            if Z[0] not in self.Sessions:
+                return sid,{'ok':False,'error':'no such session'}
+            sid = Z[0]
+        return sid,{'ok':True,'session':sid}
+
+    async def Command(self,session,Z):
+        # run one command for session, return the reply dictionary
+        cmd = Z[0]
+        if 'GUESS'==cmd:
+            if len(Z)!=3:
+                raise ValueError('use: GUESS <word> <hint>')
+            guess,response = Z[1],Z[2]
+            if not WS.Is5LUCW(guess):
+                raise ValueError(guess+' is not a 5-letter word')
+            if 5!=len(response) or not WS.GoodCharacters(response,'GY#'):
+                raise ValueError('hints are 5 letters long, using GY# only, not: '+response)
+            OldN = WS.BitCount(session.Bits)
+            session.History.Push((session.Bits,tuple(session.HintList)))
+            session.Bits &= self.Index.Hint(guess,response)
+            session.HintList.append([response,guess])
+            NewN = WS.BitCount(session.Bits)
+            return {'old':OldN,'new':NewN,'entropy':WS.Entropy(NewN)}
+
+        if 'WHATIF'==cmd:
+            if len(Z)!=2 or not WS.Is5LUCW(Z[1]):
+                raise ValueError('use: WHATIF <5-letter word>')
+            WordList = self.Index.List(session.Bits)
+            return {'word':Z[1],'entropy':WS.Entropy(len(WordList)),'after':WS.WhatIf(Z[1],WordList)}
+
+        if 'SUGGEST'==cmd:
+            limit = 10
+            if len(Z)>1:
+                try:
+                    limit = int(Z[1])
+                except ValueError:
+                    raise ValueError(Z[1]+' is not a number!')
+            Suggs = await self.Suggest(session.Bits,limit)
+            return {'entropy':WS.Entropy(WS.BitCount(session.Bits)),'suggest':Suggs}
+
+        if 'PATTERN'==cmd:
+            Z,page = WS.ParsePage(Z[1:])
+            Mask,Incl,Omit = WS.ParsePattern(Z)
+            return self.Words(session.Bits & self.Index.Pattern(Mask,Incl,Omit),page)
+
+        if 'LIST'==cmd:
+            Z,page = WS.ParsePage(Z[1:])
+            return self.Words(session.Bits,page)
+
+        if 'TABLE'==cmd:
+            return {'table':[[guess,response] for response,guess in session.HintList]}
+
+        if 'UNDO'==cmd or 'REDO'==cmd:
+            state = (session.Bits,tuple(session.HintList))
+            state = session.History.Back(state) if 'UNDO'==cmd else session.History.Forward(state)
+            if state is None:
+                raise ValueError('nothing to '+cmd.lower())
+            session.Bits,Hints = state
+            session.HintList = list(Hints)
+            N = WS.BitCount(session.Bits)
+            return {'guesses':len(Hints),'count':N,'entropy':WS.Entropy(N)}
+
+        if 'RESET'==cmd:
+            session.Bits = self.Index.All
+            session.HintList = []
+            session.History.Clear()
+            return {}
+
+        raise ValueError('Unknown command: '+cmd)
+
+    def Words(self,Bits,page):
+        # the reply listing Bits, all of it or one page
+        if page is None:
+            return {'words':self.Index.List(Bits),'count':WS.BitCount(Bits)}
+        Words,pages = self.Index.Page(Bits,page)
+        return {'words':Words,'count':WS.BitCount(Bits),'page':page,'pages':pages}
+
+    async def Suggest(self,Bits,limit):
+        # suggestions for candidates Bits, cached here, computed in the pool
+        key = None
+        if WS.SuggestMemo is not None:
+            WordList = self.Index.List(Bits)
+            Guesses = WordList if len(WordList)<3 else self.FullList
+            key = WS.SuggestMemo.Key(WordList,Guesses,WS.Scoring)
+            Suggs = WS.SuggestMemo.Get(key,limit)
+            if Suggs is not None:
+                return Suggs
+        loop = asyncio.get_running_loop()
+        Suggs = await loop.run_in_executor(self.Pool,_WorkerSuggest,Bits,limit)
+        if key is not None:
+            WS.SuggestMemo.Put(key,limit,Suggs,WS.BitCount(Bits))
+        return Suggs
+
+
+async def Serve(host,port,workers):
+    FullList = WS.LoadWordList()
+    WS.HintData = WS.LoadHintMatrix(FullList)
+    WS.SuggestMemo = WS.SuggestCache(filename=WS.SuggestCacheFile(WS.WordListFile()))
+    Server = WordleServer(FullList,workers)
+    listener = await asyncio.start_server(Server.Handle,host,port)
+    print('serving {:,d} words on {}:{:d} with {:d} suggest worker(s).'.format(
+          len(FullList),host,port,workers),flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Serve WordleSolver.py sessions over TCP.')
+    parser.add_argument('--host',default='127.0.0.1',help='address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port',type=int,default=8421,help='port to listen on (default: 8421)')
+    parser.add_argument('--workers',type=int,default=os.cpu_count() or 1,
+                        help='processes for suggestions (default: one per core)')
+    args = parser.parse_args()
+
+    print(WordleServerBanner)
+    try:
+        asyncio.run(Serve(args.host,args.port,args.workers))
+    except KeyboardInterrupt:
+        pass
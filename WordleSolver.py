@@ -14,7 +14,24 @@ If not, see <https://www.gnu.org/licenses/>.
 """
 
 import sys
+import os
 import math
+import time
+import mmap
+import hashlib
+import multiprocessing
+import heapq
+import struct
+import bisect
+import itertools
+import json
+import contextlib
+import argparse
+import cProfile
+from array import array
+from collections import Counter, OrderedDict
+from operator import itemgetter
+from functools import lru_cache
 
 WIN32 = True
 try:
@@ -24,6 +41,12 @@ try:
 except Exception as E:
     WIN32 = False
 
+# numpy is optional, it just makes the hint engines faster
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 
 GoGreen    = '\x1b[42m'
@@ -39,24 +62,48 @@ def Show(t,ch):
         print(GoBrown+ch+GoBack,end='')
     else:
         print(GoBlue+ch+GoBack,end='')
+
+
+def AskHint(guess,prompt='>hint? '):
+    # the hint wordle gave guess, asked for until confirmed; None if cancelled
+    while True:
+        response=input(prompt).upper()
+        if response=='CANCEL':
+            return None
+
+        if len(guess)!=len(response) or not GoodCharacters(response,'GY#'):
+            print('hints are {:d} letters long, using GY# only, not:'.format(len(guess)),response)
+            continue
+
+        for i in range(len(guess)):
+            Show(response[i],guess[i])
+        print('')
+        yesno = input('Is that correct? (Y/N): ').upper()
+        if yesno.startswith('Y'):
+            return response
         
 
 
 
 
 #==========================================================
-#         Check for an 5-letter upper case word
+#         Check for an N-letter upper case word
 #==========================================================
 CAPS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+Letters = 5 # the word length in play, 4 to 8, see LETTERS
 
-def Is5LUCW(word):
-    if len(word)!=5:
+def IsLUCW(word,length=None):
+    # length defaults to Letters
+    if len(word)!=(length or Letters):
         return False
     for ch in word:
         if ch not in CAPS:
             return False
     return True
 
+def Is5LUCW(word):
+    return IsLUCW(word,5)
+
 
 #==========================================================
 #         Check for valid character in word
@@ -82,40 +129,379 @@ def Select(word,Mask,Incl,Omit):
             return False
     return True
 
+def ParsePattern(Z):
+    # Z holds the words after PATTERN, returns (Mask,Incl,Omit);
+    # raises ValueError with a message for the user
+    if len(Z)<1:
+        raise ValueError('select needs a pattern!')
+    MI = Z[0].split(',')
+
+    if len(MI)<1 or len(MI[0])!=Letters:
+        raise ValueError('missing/invalid select <include> pattern.')
+    Mask=MI[0]
+    if not GoodCharacters(Mask,'.'+CAPS):
+        raise ValueError('invalid characters in '+Mask+' <include> pattern.')
+
+    Incl=''
+    if len(MI)>1:
+        Incl=MI[1]
+    if not GoodCharacters(Incl,CAPS):
+        raise ValueError('invalid characters in '+Incl+' <include> pattern.')
+
+    Omit=''
+    if len(Z)>1:
+        Omit=Z[1]
+        if '-' != Omit[0]:
+            raise ValueError('select <omit> string should start with a - sign.')
+        Omit=Omit[1:]
+    if not GoodCharacters(Omit,CAPS):
+        raise ValueError('invalid characters in '+Omit+' <omit> pattern.')
+    return Mask,Incl,Omit
+
+def ParsePage(Z):
+    # a page number ending Z is taken off it, returns (Z,page or None);
+    # raises ValueError with a message for the user
+    if not Z or not Z[-1].isdigit():
+        return Z,None
+    page = int(Z[-1])
+    if page<1:
+        raise ValueError('pages start at 1.')
+    return Z[:-1],page
+
 #==========================================================
 #            Load the word list from a file
 #==========================================================
-def LoadWordList():
-    # look for FLW.txt on same path as this python script
-    filepath = sys.argv[0].replace('\\','/')
-    while len(filepath) and filepath[-1] != '/':
-        filepath=filepath[:-1]
-    filename =  filepath+'FLW.txt'
+# Five letter words are in FLW.txt, other lengths in 4LW.txt,
+# 6LW.txt and so on. Each is compiled to a .words file the first
+# time it is read: a header recording the text file's size and
+# time, then each (de-duplicated, valid) word packed 5 bits per
+# letter, first letter lowest, into a 32-bit integer (64-bit for
+# over 6 letters). Loading it is one read.
+WORDS_MAGIC  = b'WSWL0001'
+WORDS_HEADER = struct.Struct('<8sIIqq') # magic,words,letters,text size,text mtime_ns
+
+def WordListFile(length=None):
+    # look for the word list on same path as this python script
+    length = length or Letters
+    name = 'FLW.txt' if 5==length else '{:d}LW.txt'.format(length)
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)),name)
+
+def CompiledWordListFile(filename):
+    return os.path.splitext(filename)[0]+'.words'
+
+
+def PackWord(word):
+    code = 0
+    for ch in reversed(word):
+        code = (code<<5) | (ord(ch)-ord('A'))
+    return code
+
+def PackedType(length):
+    return 'I' if 5*length<=32 else 'Q'
+
+def UnpackWords(Codes,length=5):
+    if np is not None:
+        Codes = np.asarray(Codes,dtype=np.uint32 if 'I'==PackedType(length) else np.uint64)
+        Chars = np.empty((len(Codes),length),dtype=np.uint8)
+        for i in range(length):
+            Chars[:,i] = (Codes>>(5*i)) & 31
+        Chars += ord('A')
+        text = Chars.tobytes().decode('ascii')
+        del Chars
+        return [text[i:i+length] for i in range(0,len(text),length)]
+    # without numpy, decode two letters per table lookup
+    Pairs = [a+b for b in CAPS+'??????' for a in CAPS+'??????']
+    Rest = length%2
+    WL=[]
+    for code in Codes:
+        W=''
+        for i in range(length//2):
+            W += Pairs[code&1023]
+            code >>= 10
+        WL.append(W+CAPS[code&31] if Rest else W)
+    return WL
+
+
+def ReadWordList(filename,length=5):
     WL=[] # word list
     WD={} # dictionary to avoid duplicates
     with open(filename) as file:
         for line in file:
             W = line.strip().upper()
-            if not W in WD: # duplicate?
+            if IsLUCW(W,length) and not W in WD: # duplicate?
                 WL.append(W)
                 WD[W]=WL[-1]
     return WL
 
+
+def SaveCompiledWordList(filename,WordList,stat,length=5):
+    Codes = array(PackedType(length),(PackWord(W) for W in WordList))
+    if sys.byteorder!='little':
+        Codes.byteswap()
+    with open(filename+'.tmp','wb') as file:
+        file.write(WORDS_HEADER.pack(WORDS_MAGIC,len(WordList),length,stat.st_size,stat.st_mtime_ns))
+        file.write(Codes.tobytes())
+    os.replace(filename+'.tmp',filename)
+
+
+def LoadCompiledWordList(filename,stat,length=5):
+    # the words in filename, or None if it is not for this version of the text
+    with open(filename,'rb') as file:
+        data = file.read()
+    if len(data)<WORDS_HEADER.size:
+        return None
+    magic,count,letters,size,mtime = WORDS_HEADER.unpack_from(data)
+    if (magic,letters,size,mtime)!=(WORDS_MAGIC,length,stat.st_size,stat.st_mtime_ns):
+        return None
+    Codes = array(PackedType(length))
+    Codes.frombytes(data[WORDS_HEADER.size:WORDS_HEADER.size+Codes.itemsize*count])
+    if sys.byteorder!='little':
+        Codes.byteswap()
+    return UnpackWords(Codes,length) if len(Codes)==count else None
+
+
+def LoadWordList(filename=None,length=None):
+    # read the compiled word list, (re)compiling it if the text changed;
+    # length defaults to Letters, filename to its word list
+    length = length or Letters
+    if filename is None:
+        filename = WordListFile(length)
+    compiled = CompiledWordListFile(filename)
+    stat = os.stat(filename)
+    try:
+        WL = LoadCompiledWordList(compiled,stat,length)
+        if WL is not None:
+            return WL
+    except OSError:
+        pass
+    WL = ReadWordList(filename,length)
+    try:
+        SaveCompiledWordList(compiled,WL,stat,length)
+    except OSError:
+        pass # e.g. a read-only directory, just use the text
+    return WL
+
+#==========================================================
+#       Letter/position bitset index of a word list
+#==========================================================
+# A set of words is a python int with bit i set for word i,
+# so sets are intersected with & and complemented with ~.
+# Hint and pattern filters are just that, so candidates are a
+# pipeline of bitset stages, turned into words (Iter, List) only
+# when needed, a page at a time if need be.
+
+def BitCount(bits):
+    return bin(bits).count('1')
+
+BYTE_BITS = [tuple(i for i in range(8) if b>>i & 1) for b in range(256)] # the bits set in each byte
+LIST_SCAN = 80 # above this many words, List scans bytes rather than peeling bits
+LIST_PAGE = 100 # words per page for LIST and PATTERN
+
+class WordIndex:
+    """Bitsets of the words with each letter at each position, or
+    with at least k copies of a letter, for answering pattern and
+    hint queries by intersection.
+    """
+
+    def __init__(self,Words):
+        self.Words = Words
+        self.N = len(Words)
+        self.All = (1<<self.N)-1
+        self.Ids = {W:i for i,W in enumerate(Words)}
+        size = self.N//8+1
+        At = {}     # (position,letter) -> bitmap
+        Least = {}  # (letter,copies)   -> bitmap
+        for i,W in enumerate(Words):
+            byte,bit = i>>3,1<<(i&7)
+            for pos,ch in enumerate(W):
+                At.setdefault((pos,ch),bytearray(size))[byte] |= bit
+            for ch,k in Counter(W).items():
+                for copies in range(1,k+1):
+                    Least.setdefault((ch,copies),bytearray(size))[byte] |= bit
+        self.At = {key:int.from_bytes(B,'little') for key,B in At.items()}
+        self.Least = {key:int.from_bytes(B,'little') for key,B in Least.items()}
+
+    def AtPos(self,pos,ch):
+        return self.At.get((pos,ch),0)
+
+    def AtLeast(self,ch,copies):
+        # words with at least copies of letter ch
+        if copies<1:
+            return self.All
+        return self.Least.get((ch,copies),0)
+
+    def Has(self,ch):
+        return self.AtLeast(ch,1)
+
+    def Bits(self,WordList):
+        """Return the bitset of WordList, or None if any are unknown."""
+        B = bytearray(self.N//8+1)
+        try:
+            for W in WordList:
+                i = self.Ids[W]
+                B[i>>3] |= 1<<(i&7)
+        except KeyError:
+            return None
+        return int.from_bytes(B,'little')
+
+    def List(self,bits):
+        """Return the words of bits, in word list order."""
+        if BitCount(bits)>LIST_SCAN:
+            return list(self.Iter(bits)) # scanning bytes is quicker for big sets
+        R=[]
+        Words = self.Words
+        while bits:
+            low = bits & -bits
+            R.append(Words[low.bit_length()-1])
+            bits ^= low
+        return R
+
+    def Iter(self,bits,start=0):
+        """Yield the words of bits in word list order, from the start-th.
+
+        Bits are read a byte at a time, so each word costs the same
+        however big the set is, and skipped words cost next to nothing.
+        """
+        Words = self.Words
+        data = bits.to_bytes(self.N//8+1,'little')
+        for k,byte in enumerate(data):
+            if not byte:
+                continue
+            Bits = BYTE_BITS[byte]
+            if start>=len(Bits):
+                start -= len(Bits)
+                continue
+            base = k*8
+            for i in Bits[start:]:
+                yield Words[base+i]
+            start = 0
+
+    def Page(self,bits,page,size=None):
+        """Return (the words on page, the number of pages) of bits, from page 1."""
+        size = size or LIST_PAGE
+        pages = max(1,-(-BitCount(bits)//size))
+        return list(itertools.islice(self.Iter(bits,(page-1)*size),size)),pages
+
+    def Pattern(self,Mask,Incl='',Omit=''):
+        """Bitset of the words which Select(word,Mask,Incl,Omit) accepts."""
+        bits = self.All
+        for pos,ch in enumerate(Mask):
+            if ch!='.':
+                bits &= self.AtPos(pos,ch)
+        for ch in Incl:
+            bits &= self.Has(ch)
+        for ch in Omit:
+            bits &= ~self.Has(ch)
+        return bits
+
+    def Hint(self,guess,response):
+        """Bitset of the words W with MakeHint(W,guess)==response."""
+        bits = self.All
+        Found = Counter() # green and yellow copies of each letter
+        Grey = set()      # letters with a '#', so their count is exact
+        for pos,ch in enumerate(guess):
+            r = response[pos]
+            if 'G'==r:
+                bits &= self.AtPos(pos,ch)
+                Found[ch] += 1
+                continue
+            bits &= ~self.AtPos(pos,ch)
+            if 'Y'==r:
+                if ch in Grey:
+                    return 0 # MakeHint gives yellows before greys
+                Found[ch] += 1
+            else:
+                Grey.add(ch)
+        for ch in set(guess):
+            bits &= self.AtLeast(ch,Found[ch])
+            if ch in Grey:
+                bits &= ~self.AtLeast(ch,Found[ch]+1)
+        return bits
+
+    def HardGuesses(self,guess,response):
+        """Bitset of the words hard mode still allows as guesses after
+        guess got response: its greens in place, at least as many of
+        each letter as it found, and none of a letter it found absent.
+        """
+        bits = self.All
+        Found = Counter()
+        for pos,ch in enumerate(guess):
+            r = response[pos]
+            if 'G'==r:
+                bits &= self.AtPos(pos,ch)
+            if r in 'GY':
+                Found[ch] += 1
+        for ch in set(guess):
+            if Found[ch]:
+                bits &= self.AtLeast(ch,Found[ch])
+            else:
+                bits &= ~self.Has(ch)
+        return bits
+
+    def HintListBits(self,HintList):
+        """Bitset of the words consistent with every [response,guess]."""
+        bits = self.All
+        for response,guess in HintList:
+            bits &= self.Hint(guess,response)
+        return bits
+
+
+#==========================================================
+#          Undo/redo history of a game's guesses
+#==========================================================
+class GameHistory:
+    """Snapshots of a game, taken before each guess, for UNDO and REDO.
+
+    A snapshot is whatever the caller keeps, here the candidates as an
+    index bitset, the candidate list and the hints. Bitsets and lists
+    are replaced rather than changed, so snapshots share them: taking
+    or restoring one copies nothing and recomputes no hints.
+    """
+
+    def __init__(self):
+        self.Undo = []
+        self.Redo = []
+
+    def Push(self,state):
+        # a new move: the old future is gone
+        self.Undo.append(state)
+        self.Redo.clear()
+
+    def Back(self,state):
+        """Return the state before state, or None if there is none."""
+        if not self.Undo:
+            return None
+        self.Redo.append(state)
+        return self.Undo.pop()
+
+    def Forward(self,state):
+        """Return the state undone from state, or None if there is none."""
+        if not self.Redo:
+            return None
+        self.Undo.append(state)
+        return self.Redo.pop()
+
+    def Clear(self):
+        self.Undo.clear()
+        self.Redo.clear()
+
+
 #==========================================================
 #      Given a word, generate wordle's hint response
 #==========================================================
 def MakeHint(Word,guess):
     W = Word # manipulate W, don't change Word
-    R = ['.']*5
+    L = len(guess)
+    R = ['.']*L
 
     # 'G' pass
-    for i in range(5):
+    for i in range(L):
         if W[i]==guess[i]:
             R[i]='G'
             W = W[:i]+'.'+W[i+1:] # deal with repeated letters
 
     # 'Y' pass
-    for i in range(5):
+    for i in range(L):
         if '.' != R[i]:
             continue
         j = W.find(guess[i])
@@ -124,32 +510,912 @@ def MakeHint(Word,guess):
             W = W[:j]+'.'+W[j+1:] # deal with repeated letters
 
     # '#' pass
-    for i in range(5):
+    for i in range(L):
         if '.' != R[i]:
             continue
         j = W.find(guess[i])
         if -1==j:
             R[i]='#'
 
-    return R[0]+R[1]+R[2]+R[3]+R[4]
+    return ''.join(R)
+
+
+#==========================================================
+#      Hint codes: a hint as a small integer
+#==========================================================
+# Each letter of a hint is a base-3 digit ('#'=0, 'Y'=1, 'G'=2),
+# first letter least significant, so 5-letter hints fit in 0..242
+# (a byte) and 8-letter ones in 0..6560 (16 bits).
+HINTCHARS = '#YG'
+
+def HintCount(length=None):
+    # how many hint codes there are for length (default Letters) letters;
+    # the last, HintCount()-1, is all green
+    return 3**(length or Letters)
+
+def HintCode(hint):
+    code = 0
+    for ch in reversed(hint):
+        code = code*3 + HINTCHARS.index(ch)
+    return code
+
+def MakeHintCode(Word,guess):
+    # same rules as MakeHint, but returns the hint code
+    code = 0
+    power = 1
+    Left = [] # letters of Word not matched green
+    Todo = [] # (power,letter) of guess not matched green
+    for i in range(len(guess)):
+        if Word[i]==guess[i]:
+            code += 2*power
+        else:
+            Left.append(Word[i])
+            Todo.append((power,guess[i]))
+        power *= 3
+    for power,ch in Todo:
+        if ch in Left:
+            code += power
+            Left.remove(ch) # deal with repeated letters
+    return code
+
+
+#==========================================================
+#     Batch hint engine over encoded word arrays (numpy)
+#==========================================================
+# Words are encoded as rows of letter indices (A=0 .. Z=25).
+BATCH_PAIRS = 1<<20 # (guess, word) pairs per block, bounds temporary memory
+
+def EncodeWords(WordList,length=None):
+    # a single word encodes to shape (L,), a list of words to (n,L);
+    # length defaults to the words' own
+    text = ''.join(WordList).encode('ascii')
+    Encoded = np.frombuffer(text,dtype=np.uint8) - np.uint8(ord('A'))
+    if isinstance(WordList,str):
+        return Encoded
+    return Encoded.reshape(-1,length or (len(WordList[0]) if WordList else Letters))
+
+
+def HintDtype(length=5):
+    return np.uint8 if 3**length<=256 else np.uint16
+
+
+def BatchHintCodes(guesses,words):
+    """Return the hint codes of encoded guesses against encoded words.
+
+    guesses is one encoded word (shape (L,)) or many (shape (G,L)),
+    words has shape (n,L). The result has shape (n,) or (G,n) and
+    matches MakeHintCode, including its handling of repeated letters.
+    """
+    single = guesses.ndim==1
+    guesses = np.atleast_2d(guesses)
+    G,L = guesses.shape
+    Codes = np.empty((G,len(words)),dtype=HintDtype(L))
+    step = max(1,BATCH_PAIRS//max(1,len(words)))
+    for start in range(0,G,step):
+        g = guesses[start:start+step]
+        # green[i], open_[i] are (guesses,words) flags for letter i
+        green = [g[:,i,None]==words[None,:,i] for i in range(L)]
+        open_ = [~x for x in green]
+        code = np.zeros(green[0].shape,dtype=Codes.dtype)
+        for i in range(L):
+            gi = g[:,i,None]
+            # word letters still free to match guess letter i ...
+            avail = np.zeros(code.shape,dtype=np.uint8)
+            for k in range(L):
+                avail += (gi==words[None,:,k]) & open_[k]
+            # ... less those taken by the same letter further left
+            prior = np.zeros(code.shape,dtype=np.uint8)
+            for j in range(i):
+                prior += (g[:,j,None]==gi) & open_[j]
+            yellow = open_[i] & (avail>prior)
+            code += (2*green[i] + yellow).astype(Codes.dtype) * Codes.dtype.type(3**i)
+        Codes[start:start+step] = code
+    return Codes[0] if single else Codes
+
+
+def CodeCounts(Codes,length=None):
+    # partition sizes for each row of a 2-D hint code array
+    K = HintCount(length)
+    G = len(Codes)
+    offsets = (np.arange(G,dtype=np.int64)*K)[:,None]
+    return np.bincount((Codes+offsets).ravel(),minlength=G*K).reshape(G,K)
+
+
+@lru_cache(maxsize=8)
+def EntropyTermList(total):
+    # Entropy(c,total) for every c in 0..total, as a tuple
+    return tuple(Entropy(c,total) for c in range(total+1))
+
+
+@lru_cache(maxsize=8)
+def EntropyTerms(total):
+    # EntropyTermList(total) as a numpy array
+    return np.array(EntropyTermList(total))
+
+
+def CountEntropies(Counts,total):
+    # the PartitionEntropy of each row of a 2-D partition size array;
+    # a term table and sequential sums keep results bit-identical
+    Terms = EntropyTerms(total)
+    return np.cumsum(Terms[np.sort(Counts,axis=1)],axis=1)[:,-1]
+
+
+def CodeEntropies(Codes,total,length=None):
+    # the PartitionEntropy of each row of a 2-D hint code array
+    return CountEntropies(CodeCounts(Codes,length),total)
+
+
+#==========================================================
+#   Precomputed guess x answer hint matrix, cached on disk
+#==========================================================
+# The cache file lives next to the word list. Its header holds a
+# digest of the list, so it is rebuilt when the list changes. Codes
+# are one byte each, or two (little endian) for over 5 letters, and
+# the words follow, packed as in the .words file. Processes map the
+# file read-only, so however many there are they share one copy.
+MATRIX_MAGIC  = b'WSHM0002'
+MATRIX_HEADER = 40 # magic(8) + words(4) + letters(4) + sha1(20) + pad(4)
+MATRIX_LIMIT  = 10000 # bigger word lists get no matrix (N*N codes), the
+                      # batch engine and the WordIndex work without one
+
+HintData = None # the HintMatrix in use, if any
+
+def WordListDigest(WordList):
+    return hashlib.sha1('\n'.join(WordList).encode('ascii')).digest()
+
+class HintMatrix:
+    """Hint codes for every (guess, answer) pair of a word list.
 
+    Row g holds the codes of guess Words[g] against every word,
+    so Row(g)[a] == MakeHintCode(Words[a],Words[g]).
+    """
+
+    def __init__(self,Words,Table,Offset=0,File=None):
+        self.Words = Words
+        self.File = File   # the cache file Table is mapped from, if any
+        self.N = len(Words)
+        self.Size = CodeSize(len(Words[0]) if Words else Letters) # bytes per code
+        self.Index = {W:i for i,W in enumerate(Words)}
+        self.Table = Table # bytes-like, N*N codes from Offset
+        self.Offset = Offset
+        self.Array = None  # numpy (N,N) view of Table, if numpy is present
+        if np is not None:
+            self.Array = np.frombuffer(Table,dtype=np.uint8 if 1==self.Size else '<u2',
+                                       count=self.N*self.N,offset=Offset).reshape(self.N,self.N)
+
+    def Row(self,g):
+        start = self.Offset + g*self.N*self.Size
+        if 1==self.Size:
+            return self.Table[start:start+self.N]
+        Row = array('H',self.Table[start:start+2*self.N])
+        if sys.byteorder!='little':
+            Row.byteswap()
+        return Row
+
+    def Ids(self,WordList):
+        """Return the word ids of WordList, or None if any are unknown."""
+        Index = self.Index
+        try:
+            return [Index[W] for W in WordList]
+        except KeyError:
+            return None
+
+    def Codes(self,gids,ids):
+        """Return the (len(gids),len(ids)) codes of guesses gids against ids."""
+        return self.Array[np.asarray(gids,dtype=np.intp)[:,None],np.asarray(ids,dtype=np.intp)[None,:]]
+
+
+def CodeSize(length):
+    # bytes per hint code for length letters
+    return 1 if HintCount(length)<=256 else 2
+
+def BuildHintTable(WordList):
+    N = len(WordList)
+    L = len(WordList[0]) if WordList else Letters
+    if np is not None:
+        Encoded = EncodeWords(WordList,L)
+        return bytearray(BatchHintCodes(Encoded,Encoded).astype('<u2' if 2==CodeSize(L) else np.uint8).tobytes())
+    Table = bytearray(N*N) if 1==CodeSize(L) else array('H',bytes(2*N*N))
+    for g,guess in enumerate(WordList):
+        base = g*N
+        for a,Word in enumerate(WordList):
+            Table[base+a] = MakeHintCode(Word,guess)
+    if 2==CodeSize(L):
+        if sys.byteorder!='little':
+            Table.byteswap()
+        Table = bytearray(Table.tobytes())
+    return Table
+
+def HintMatrixFile(filename):
+    return os.path.splitext(filename)[0]+'.hints'
+
+
+def AttachHintMatrix(filename=None):
+    """Map a saved hint matrix read-only, with the word list it holds,
+    or return None if there is no valid one.
+
+    No word list is needed first, so other processes (pool workers,
+    servers, batch jobs) attach in milliseconds, sharing its pages.
+    """
+    if filename is None:
+        filename = HintMatrixFile(WordListFile())
+    try:
+        with open(filename,'rb') as file:
+            Table = mmap.mmap(file.fileno(),0,access=mmap.ACCESS_READ)
+    except (OSError,ValueError): # ValueError: an empty file
+        return None
+    N = int.from_bytes(Table[8:12],'little')
+    L = int.from_bytes(Table[12:16],'little')
+    if Table[:8]!=MATRIX_MAGIC or not N or L not in range(4,9):
+        return None
+    start = MATRIX_HEADER+N*N*CodeSize(L)
+    Codes = array(PackedType(L))
+    if len(Table)!=start+N*Codes.itemsize:
+        return None
+    Codes.frombytes(Table[start:])
+    if sys.byteorder!='little':
+        Codes.byteswap()
+    Words = UnpackWords(Codes,L)
+    if WordListDigest(Words)!=Table[16:36]:
+        return None
+    return HintMatrix(Words,Table,MATRIX_HEADER,filename)
+
+
+def LoadHintMatrix(WordList,filename=None):
+    # map the cached matrix if it matches WordList, else build and save it;
+    # None for word lists over MATRIX_LIMIT
+    if len(WordList)>MATRIX_LIMIT:
+        print('({:,d} words is too many for a hint matrix, hints are computed as needed).'.format(
+              len(WordList)),file=sys.stderr)
+        return None
+    L = len(WordList[0]) if WordList else Letters
+    if filename is None:
+        filename = HintMatrixFile(WordListFile(L))
+    Matrix = AttachHintMatrix(filename)
+    if Matrix is not None and Matrix.Words==WordList:
+        Matrix.Words = WordList # share the caller's list
+        return Matrix
+
+    N = len(WordList)
+    print('(building hint matrix for {:,d} words, this only happens once).'.format(N),file=sys.stderr)
+    Table = BuildHintTable(WordList)
+    Codes = array(PackedType(L),(PackWord(W) for W in WordList))
+    if sys.byteorder!='little':
+        Codes.byteswap()
+    Header = (MATRIX_MAGIC + N.to_bytes(4,'little') + L.to_bytes(4,'little')
+              + WordListDigest(WordList) + bytes(MATRIX_HEADER-36))
+    try:
+        with open(filename+'.tmp','wb') as file:
+            file.write(Header)
+            file.write(Table)
+            file.write(Codes.tobytes())
+        os.replace(filename+'.tmp',filename)
+    except OSError as E:
+        print('(could not save hint matrix:',E,')',file=sys.stderr)
+    else:
+        Matrix = AttachHintMatrix(filename) # share the saved copy
+        if Matrix is not None:
+            Matrix.Words = WordList
+            return Matrix
+    return HintMatrix(WordList,bytes(Table))
+
+
+#==========================================================
+#        Filter a word list by a guess and its hint
+#==========================================================
+def FilterWords(WordList,guess,response):
+    code = HintCode(response)
+    if HintData is not None and guess in HintData.Index:
+        ids = HintData.Ids(WordList)
+        if ids is not None:
+            g = HintData.Index[guess]
+            if HintData.Array is not None:
+                Keep = HintData.Codes([g],ids)[0]==code
+                return [W for W,k in zip(WordList,Keep.tolist()) if k]
+            Row = HintData.Row(g)
+            return [W for W,i in zip(WordList,ids) if Row[i]==code]
+    if np is not None and WordList:
+        Keep = BatchHintCodes(EncodeWords(guess),EncodeWords(WordList))==code
+        return [W for W,k in zip(WordList,Keep.tolist()) if k]
+    WL=[]
+    for Word in WordList:
+        if response == MakeHint(Word,guess):
+            WL.append(Word)
+    return WL
 
 #==========================================================
 #                Suggest a guess
 #==========================================================
-def Suggest(WordList,FullList):
-    Suggs=[]
-    if len(WordList)<3:
-        for W in WordList:
-            H = WhatIf(W,WordList)
-            Suggs.append([H,W])
+def Suggest(WordList,FullList,workers=None,limit=None,scorer=None):
+    # workers defaults to the WORKERS setting and scorer (a SCORERS
+    # name) to the SCORE setting; with a limit only the best limit
+    # rows are returned, and found by TopSuggest
+    if workers is None:
+        workers = Workers
+    if scorer is None:
+        scorer = Scoring
+    Guesses = WordList if len(WordList)<3 else FullList
+    key = None
+    if SuggestMemo is not None:
+        key = SuggestMemo.Key(WordList,Guesses,scorer)
+        Suggs = SuggestMemo.Get(key,limit)
+        if Suggs is not None:
+            return Suggs
+    if workers>1 and len(Guesses)*len(WordList)>=PARALLEL_PAIRS:
+        Suggs = ParallelSuggest(Guesses,WordList,workers,limit,scorer)
+    elif limit is not None:
+        Suggs = TopSuggest(Guesses,WordList,limit,scorer)
     else:
-        for W in FullList:
-            H = WhatIf(W,WordList)
-            Suggs.append([H,W])
-    Suggs.sort()
+        Suggs = [[H,W] for H,W in zip(GuessScores(Guesses,WordList,scorer),Guesses)]
+        Suggs.sort()
+    if key is not None:
+        SuggestMemo.Put(key,limit,Suggs,len(WordList))
     return Suggs
 
+
+def GuessScores(Guesses,WordList,scorer='entropy'):
+    # the score of each W in Guesses (WhatIf(W,WordList) for entropy),
+    # using the fastest engine
+    Score = SCORERS[scorer]
+    ids = gids = None
+    if HintData is not None:
+        ids = HintData.Ids(WordList)
+        gids = HintData.Ids(Guesses)
+    if np is not None and WordList:
+        L = len(WordList[0])
+        step = max(1,BATCH_PAIRS//max(len(WordList),HintCount(L))) # codes or counts
+        if ids is not None and gids is not None:
+            Blocks = (HintData.Codes(gids[i:i+step],ids) for i in range(0,len(gids),step))
+        else:
+            Encoded = EncodeWords(WordList)
+            Blocks = (BatchHintCodes(EncodeWords(Guesses[i:i+step]),Encoded)
+                      for i in range(0,len(Guesses),step))
+        Hs=[]
+        for Codes in Blocks:
+            Hs.extend(Score.Scores(CodeCounts(Codes,L),len(WordList)).tolist())
+        return Hs
+    return [Score.Guess(W,WordList,ids) for W in Guesses]
+
+#==========================================================
+#       Suggestion cache, keyed by the candidate set
+#==========================================================
+CACHE_SIZE = 64        # suggestions kept in memory
+CACHE_DISK_WORDS = 100 # suggestions for at least this many candidates are saved
+CACHE_DISK_LINES = 4*CACHE_SIZE # lines the file may reach before it is rewritten
+
+class SuggestCache:
+    """A least recently used cache of Suggest results.
+
+    Keys are digests of the sorted candidates, the guess pool and the
+    scorer, so any route to the same candidate set shares an entry. Results for
+    big candidate sets (the slow ones: openings, common second turns)
+    are also appended to an optional file, and read back at start up.
+    Once the file holds more than CACHE_DISK_LINES lines it is rewritten
+    with just the saved entries the cache still holds.
+    """
+
+    def __init__(self,size=CACHE_SIZE,filename=None):
+        self.Size = size
+        self.File = filename
+        self.Entries = OrderedDict() # key -> (limit, Suggs)
+        self.Hits = self.Misses = self.Loaded = self.Saved = 0
+        self.Pools = {} # id of a guess pool -> (pool, its digest)
+        self.Disk = set() # keys of the entries which belong in the file
+        self.Lines = 0    # lines in the file
+        if filename is not None:
+            self.Load()
+
+    def Key(self,WordList,Guesses,scorer='entropy'):
+        pool = self.Pools.get(id(Guesses))
+        if pool is None or pool[0] is not Guesses:
+            pool = (Guesses,WordListDigest(Guesses))
+            self.Pools = {id(Guesses):pool}
+        # entropy keys have no scorer name, so older cache files still match
+        text = '\n'.join(sorted(WordList)) if 'entropy'==scorer else scorer+':'+'\n'.join(sorted(WordList))
+        return hashlib.sha1(pool[1]+text.encode('ascii')).hexdigest()
+
+    def Get(self,key,limit=None):
+        # a copy of the cached Suggs, if they cover limit rows
+        entry = self.Entries.get(key)
+        if entry is not None and (entry[0] is None or (limit is not None and entry[0]>=limit)):
+            self.Entries.move_to_end(key)
+            self.Hits += 1
+            return [S[:] for S in entry[1][:limit]]
+        self.Misses += 1
+        return None
+
+    def Put(self,key,limit,Suggs,words=0):
+        self.Store(key,limit,[S[:] for S in Suggs])
+        if self.File is not None and words>=CACHE_DISK_WORDS:
+            self.Disk.add(key)
+            try:
+                with open(self.File,'a') as file:
+                    file.write(json.dumps([key,limit,Suggs])+'\n')
+                self.Saved += 1
+                self.Lines += 1
+            except OSError as E:
+                print('(could not save suggestion:',E,')',file=sys.stderr)
+            if self.Lines>CACHE_DISK_LINES:
+                self.Compact()
+
+    def Store(self,key,limit,Suggs):
+        old = self.Entries.get(key)
+        if old is not None and (old[0] is None or (limit is not None and old[0]>=limit)):
+            return # already holds at least as many rows
+        self.Entries[key] = (limit,Suggs)
+        self.Entries.move_to_end(key)
+        while len(self.Entries)>self.Size:
+            self.Entries.popitem(last=False)
+
+    def Load(self):
+        try:
+            with open(self.File) as file:
+                for line in file:
+                    try:
+                        key,limit,Suggs = json.loads(line)
+                    except ValueError:
+                        continue # e.g. a line cut short
+                    finally:
+                        self.Lines += 1
+                    self.Store(key,limit,Suggs)
+                    self.Disk.add(key)
+                    self.Loaded += 1
+        except OSError:
+            pass
+        if self.Lines>CACHE_DISK_LINES:
+            self.Compact()
+
+    def Compact(self):
+        # rewrite the file with only the saved entries still cached,
+        # least recently used first, as Load reads them
+        self.Disk &= self.Entries.keys()
+        Lines = [json.dumps([key,limit,Suggs])+'\n'
+                 for key,(limit,Suggs) in self.Entries.items() if key in self.Disk]
+        try:
+            with open(self.File+'.tmp','w') as file:
+                file.writelines(Lines)
+            os.replace(self.File+'.tmp',self.File)
+            self.Lines = len(Lines)
+        except OSError as E:
+            print('(could not rewrite suggestion file:',E,')',file=sys.stderr)
+
+    def Clear(self):
+        self.Entries.clear()
+        self.Disk.clear()
+        self.Lines = 0
+        if self.File is not None and os.path.exists(self.File):
+            os.remove(self.File)
+
+    def Report(self):
+        looks = self.Hits+self.Misses
+        rate = 100*self.Hits/looks if looks else 0
+        return ('suggest cache: {:d}/{:d} entries, {:d} hits, {:d} misses ({:.0f}% hits),'
+                ' {:d} loaded from and {:d} saved to disk.').format(
+                len(self.Entries),self.Size,self.Hits,self.Misses,rate,self.Loaded,self.Saved)
+
+
+SuggestMemo = SuggestCache() # the cache Suggest uses, or None
+
+def SuggestCacheFile(filename):
+    return os.path.splitext(filename)[0]+'.suggest'
+
+
+#==========================================================
+#        Top-k Suggest with early termination
+#==========================================================
+TOP_BLOCK = 512    # guesses scored together by the numpy engine
+TOP_EPS = 1e-9     # slack so rounding never drops a qualifying guess
+TOP_PAIRS = 1<<21  # smaller (guess, word) jobs are simply scored in full
+
+def LetterPromise(WordList):
+    # a cheap guess ordering: letters that split the candidates evenly
+    n = len(WordList)
+    freq = Counter(ch for W in WordList for ch in set(W))
+    return lambda W: sum(freq[ch]*(n-freq[ch]) for ch in set(W))
+
+
+def CheckPoints(n):
+    # candidates counted before each cut-off check; bounds on less
+    # than about half the candidates hardly ever cut anything off
+    return sorted({max(1,n*k//8) for k in (5,6,7,8)})
+
+
+def RowCodes(Row,ids):
+    if len(ids)>1:
+        return itemgetter(*ids)(Row)
+    return tuple(Row[i] for i in ids)
+
+
+def FillBound(Counts,remaining,total):
+    """Lower bounds on the entropies of rows of partial partition sizes.
+
+    The remaining words are poured as evenly as possible into the
+    smallest partitions (empty codes included). c*log(c) is convex,
+    so no real outcome can end with a smaller total.
+    """
+    c = np.sort(Counts,axis=1).astype(np.float64)
+    G,K = c.shape
+    below = np.cumsum(c,axis=1)
+    above = np.concatenate([c[:,1:],np.full((G,1),np.inf)],axis=1)
+    need = np.arange(1,K+1)*above - below  # to raise the j+1 smallest to the next size
+    j = (need<remaining).sum(axis=1)       # ... so the j+1 smallest end up level
+    rows = np.arange(G)
+    level = (remaining+below[rows,j])/(j+1)
+    F = c*np.log2(np.maximum(c,1))
+    rest = F.sum(axis=1) - np.cumsum(F,axis=1)[rows,j]
+    return ((j+1)*level*np.log2(np.maximum(level,1)) + rest)/total
+
+
+def TopSuggest(Guesses,WordList,limit,scorer='entropy'):
+    """Return Suggest(...)[:limit] without scoring every guess fully.
+
+    Guesses are tried most promising first, counting their partitions a
+    slice of candidates at a time. Partitions only grow, so a bound on
+    the final score can be taken from a partial count: once it passes
+    the current limit-th best the guess cannot qualify and is dropped.
+    """
+    Score = SCORERS[scorer]
+    n = len(WordList)
+    if limit<1 or not Guesses or not n:
+        return []
+    L = len(WordList[0])
+    ids = gids = None
+    if HintData is not None:
+        ids = HintData.Ids(WordList)
+        gids = HintData.Ids(Guesses)
+    if np is not None and ((ids is not None and gids is not None) or len(Guesses)*n<TOP_PAIRS):
+        # numpy scores whole matrix rows, or small jobs, faster than it bounds them
+        Hs = GuessScores(Guesses,WordList,scorer)
+        return heapq.nsmallest(limit,([H,W] for H,W in zip(Hs,Guesses)))
+
+    Order = sorted(Guesses,key=LetterPromise(WordList),reverse=True)
+    if gids is not None:
+        gids = HintData.Ids(Order)
+    Heap = [] # the best rows so far, worst on top: (-H, -letters, W)
+
+    def Offer(H,W):
+        item = (-H,[-ord(ch) for ch in W],W)
+        if len(Heap)<limit:
+            heapq.heappush(Heap,item)
+        elif item>Heap[0]:
+            heapq.heapreplace(Heap,item)
+
+    def Cutoff():
+        return -Heap[0][0]+TOP_EPS if len(Heap)==limit else math.inf
+
+    if np is not None:
+        EncG,EncW = EncodeWords(Order),EncodeWords(WordList)
+        for b in range(0,len(Order),TOP_BLOCK):
+            alive = np.arange(b,min(b+TOP_BLOCK,len(Order)))
+            Counts = np.zeros((len(alive),HintCount(L)),dtype=np.int64)
+            c0 = 0
+            for c1 in CheckPoints(n):
+                Counts[alive-b] += CodeCounts(BatchHintCodes(EncG[alive],EncW[c0:c1]),L)
+                c0 = c1
+                if len(Heap)==limit and c1<n:
+                    alive = alive[Score.Bounds(Counts[alive-b],n-c1,n)<=Cutoff()]
+                    if not len(alive):
+                        break
+            if len(alive):
+                for g,H in zip(alive.tolist(),Score.Scores(Counts[alive-b],n).tolist()):
+                    Offer(H,Order[g])
+    else:
+        for g,W in enumerate(Order):
+            if gids is not None and ids is not None:
+                Row = HintData.Row(gids[g])
+                Codes = lambda c0,c1: RowCodes(Row,ids[c0:c1])
+            else:
+                Codes = lambda c0,c1: [MakeHintCode(Word,W) for Word in WordList[c0:c1]]
+            H = Score.Count(Codes,n,Cutoff(),L)
+            if H is not None:
+                Offer(H,W)
+
+    return sorted([-H,W] for H,_,W in Heap)
+
+#==========================================================
+#         Ways to score a guess, see SCORE
+#==========================================================
+# A scorer ranks a guess by the sizes of the hint partitions it makes
+# of the candidates; lower is better. Each counts a guess's hints with
+# its own early exit, given the score it must not exceed.
+SCORE_BLOCK = 64   # candidates counted between cheap cut-off checks
+
+class EntropyScorer:
+    """The expected entropy left after the guess: the default."""
+
+    Label = 'Entropy'
+
+    def Score(self,Counts,total):
+        return PartitionEntropy(Counts,total)
+
+    def Scores(self,Counts,total):
+        # Score of each row of a numpy (guesses, codes) count array
+        return CountEntropies(Counts,total)
+
+    def Bounds(self,Counts,remaining,total):
+        # lower bounds on Scores once remaining more words are counted
+        return FillBound(Counts,remaining,total)
+
+    def Guess(self,guess,WordList,ids=None):
+        return WhatIf(guess,WordList,ids)
+
+    def Count(self,Codes,total,cutoff,length=None):
+        # the Score of the codes Codes(c0,c1) gives for candidates
+        # c0 to c1 (of length letters), or None once it cannot come
+        # in under cutoff
+        Terms = EntropyTermList(total) # made once per total, not per guess
+        Counts = Counter()
+        c0 = 0
+        for c1 in CheckPoints(total):
+            Counts.update(Codes(c0,c1))
+            c0 = c1
+            if c1<total and sum(map(Terms.__getitem__,Counts.values()))>cutoff:
+                return None
+        return PartitionEntropy(Counts.values(),total)
+
+
+class MaxBucketScorer:
+    """The size of the largest hint partition: the worst case."""
+
+    Label = 'Largest hint'
+
+    def Score(self,Counts,total):
+        return max(Counts,default=0)
+
+    def Scores(self,Counts,total):
+        return Counts.max(axis=1)
+
+    def Bounds(self,Counts,remaining,total):
+        return Counts.max(axis=1)
+
+    def Guess(self,guess,WordList,ids=None):
+        return self.Score(GuessCounts(guess,WordList,ids),len(WordList))
+
+    def Count(self,Codes,total,cutoff,length=None):
+        # out as soon as any partition outgrows cutoff
+        Counts = [0]*HintCount(length)
+        for c0 in range(0,total,SCORE_BLOCK):
+            for code in Codes(c0,min(total,c0+SCORE_BLOCK)):
+                Counts[code] += 1
+                if Counts[code]>cutoff:
+                    return None
+        return max(Counts)
+
+
+class ExpectedSizeScorer:
+    """The expected number of candidates left after the guess."""
+
+    Label = 'Expected left'
+
+    def Score(self,Counts,total):
+        return sum(c*c for c in Counts)/total if total else 0
+
+    def Scores(self,Counts,total):
+        return (Counts*Counts).sum(axis=1)/total
+
+    def Bounds(self,Counts,remaining,total):
+        # each word still to come adds at least 1 to a square
+        return ((Counts*Counts).sum(axis=1)+remaining)/total
+
+    def Guess(self,guess,WordList,ids=None):
+        return self.Score(GuessCounts(guess,WordList,ids),len(WordList))
+
+    def Count(self,Codes,total,cutoff,length=None):
+        # a partition growing from c to c+1 adds 2c+1 to the squares
+        Counts = [0]*HintCount(length)
+        squares = 0
+        limit = cutoff*total
+        for c0 in range(0,total,SCORE_BLOCK):
+            for code in Codes(c0,min(total,c0+SCORE_BLOCK)):
+                squares += 2*Counts[code]+1
+                Counts[code] += 1
+            if squares>limit:
+                return None
+        return squares/total
+
+
+SCORERS = {'entropy':EntropyScorer(),'maxbucket':MaxBucketScorer(),'expected':ExpectedSizeScorer()}
+Scoring = 'entropy' # the SCORERS entry Suggest uses, see SCORE
+
+#==========================================================
+#      Two-step lookahead suggestions, see SUGGEST DEEP
+#==========================================================
+DEEP_BEAM = 20   # first guesses tried, the best by entropy
+
+def CostBound(s,length=None):
+    # no second guess leaves s candidates a lower SplitCost: one may be
+    # solved, the other s-1 spread over the other hints (242 for 5
+    # letters) at best
+    return max(s-1,-(-(s-1)*(s-1)//(HintCount(length)-1))) if s else 0
+
+
+def HintBuckets(g,ids):
+    # the ids split by the hint guess id g gets, largest first
+    Row = HintData.Row(g)
+    Buckets = {}
+    for i in ids:
+        Buckets.setdefault(Row[i],[]).append(i)
+    return sorted(Buckets.items(),key=lambda item:-len(item[1]))
+
+
+def FollowUpCost(ids,gids,length=None):
+    # the least SplitCost (the squares of the hint partition sizes,
+    # a solved word not counted) any guess in gids gives ids, words
+    # of length letters
+    s = len(ids)
+    if s<3:
+        return max(0,s-1) # guess either word
+    if np is not None:
+        best = None
+        K = HintCount(length)
+        step = max(1,BATCH_PAIRS//max(s,K))
+        for i in range(0,len(gids),step):
+            Codes = HintData.Codes(gids[i:i+step],ids)
+            G = len(Codes)
+            # add the words one at a time: a partition growing from c to
+            # c+1 adds 2c+1 to its square, and only (G,) arrays are touched
+            Counts = np.zeros(G*K,dtype=np.int32)
+            base = np.arange(G,dtype=np.intp)*K
+            cost = np.zeros(G,dtype=np.int64)
+            for column in Codes.T:
+                at = base+column
+                c = Counts[at]
+                cost += 2*c+1
+                Counts[at] = c+1
+            cost -= (Codes==K-1).any(axis=1)
+            cost = int(cost.min())
+            best = cost if best is None else min(best,cost)
+        return best
+    best = None
+    for g in gids:
+        Counts = Counter(RowCodes(HintData.Row(g),ids))
+        cost = sum(c*c for c in Counts.values()) - Counts[HintCount(length)-1]
+        if best is None or cost<best:
+            best = cost
+            if best==s-1:
+                break # nothing does better
+    return best
+
+
+def DeepSuggest(WordList,FullList,limit=10,beam=DEEP_BEAM):
+    """Return up to limit [left, guess] rows, best first, where left is
+    the expected number of candidates after guess and the best second
+    guess for its hint (a solved word counts as none left).
+
+    The first guesses tried are the best beam by entropy. Identical
+    hint partitions are solved once, and a guess is dropped as soon as
+    a bound shows it cannot make the limit best. Needs the hint matrix.
+    """
+    n = len(WordList)
+    if HintData is None or limit<1 or not n:
+        return []
+    ids = HintData.Ids(WordList)
+    gids = HintData.Ids(FullList)
+    if ids is None or gids is None:
+        return []
+    First = Suggest(WordList,FullList,limit=max(beam,limit),scorer='entropy')
+    L = len(WordList[0])
+    green = HintCount(L)-1
+    Memo = {}  # partition ids -> FollowUpCost
+    Heap = []  # the best rows so far, worst on top: (-total, -rank, W)
+    for rank,(H,W) in enumerate(First):
+        cutoff = -Heap[0][0] if len(Heap)==limit else math.inf
+        Buckets = HintBuckets(HintData.Index[W],ids)
+        Bounds = [0 if green==code else CostBound(len(b),L) for code,b in Buckets]
+        rest = sum(Bounds)
+        total = 0
+        for (code,b),bound in zip(Buckets,Bounds):
+            if green==code:
+                continue
+            key = tuple(b)
+            if key not in Memo:
+                Memo[key] = FollowUpCost(b,gids,L)
+            total += Memo[key]
+            rest -= bound
+            if total+rest>=cutoff:
+                break # ties go to the better entropy, so W cannot qualify
+        else:
+            item = (-total,-rank,W)
+            if len(Heap)<limit:
+                heapq.heappush(Heap,item)
+            else:
+                heapq.heapreplace(Heap,item)
+    return [[-total/n,W] for total,_,W in sorted(Heap,reverse=True)]
+
+#==========================================================
+#      Several boards at once (Quordle, Octordle), see BOARDS
+#==========================================================
+def MultiSuggest(Boards,FullList,limit=10):
+    """Return the best limit [H, guess] rows for several boards at
+    once, where H is the expected entropy left summed over the boards.
+
+    Boards are candidate lists, one per unsolved board. A guess's hints
+    against the words of all the boards are worked out once and shared.
+    Boards down to one word add nothing and drop out, and boards with
+    the same candidates are scored once.
+    """
+    Sets = Counter(tuple(B) for B in Boards if len(B)>1) # candidates -> boards
+    if not Sets:
+        return [[0,W] for W in sorted({B[0] for B in Boards if B})][:limit]
+    Union = sorted(set().union(*Sets))
+    At = {W:i for i,W in enumerate(Union)}
+    Columns = [([At[W] for W in B],len(B),k) for B,k in Sets.items()]
+    Guesses = Union if len(Union)<3 else FullList
+    ids = gids = None
+    if HintData is not None:
+        ids = HintData.Ids(Union)
+        gids = HintData.Ids(Guesses)
+    L = len(Union[0])
+    Hs=[]
+    if np is not None:
+        step = max(1,BATCH_PAIRS//max(len(Union),HintCount(L)))
+        if ids is not None and gids is not None:
+            Blocks = (HintData.Codes(gids[i:i+step],ids) for i in range(0,len(gids),step))
+        else:
+            Encoded = EncodeWords(Union)
+            Blocks = (BatchHintCodes(EncodeWords(Guesses[i:i+step]),Encoded)
+                      for i in range(0,len(Guesses),step))
+        for Codes in Blocks:
+            H = 0
+            for cols,n,k in Columns:
+                H = H + k*CountEntropies(CodeCounts(Codes[:,cols],L),n)
+            Hs.extend(H.tolist())
+    else:
+        for g,W in enumerate(Guesses):
+            if ids is not None and gids is not None:
+                Codes = RowCodes(HintData.Row(gids[g]),ids)
+            else:
+                Codes = [MakeHintCode(U,W) for U in Union]
+            H = 0
+            for cols,n,k in Columns:
+                H += k*PartitionEntropy(Counter(Codes[c] for c in cols).values(),n)
+            Hs.append(H)
+    return heapq.nsmallest(limit,([H,W] for H,W in zip(Hs,Guesses)))
+
+#==========================================================
+#          Multi-core Suggest with a process pool
+#==========================================================
+Workers = 1              # processes Suggest may use, see WORKERS
+PARALLEL_PAIRS = 4<<20   # (guess, word) pairs below which Suggest stays serial
+
+_PoolWordList = None     # a pool worker's copy of the candidate list
+
+def _PoolStart(WordList,filename):
+    # runs once in each worker: keep the candidates, map the hint matrix
+    global HintData,Letters,_PoolWordList
+    _PoolWordList = WordList
+    if WordList:
+        Letters = len(WordList[0])
+    if HintData is None and filename is not None:
+        HintData = AttachHintMatrix(filename)
+
+def _PoolScores(Task):
+    Guesses,scorer = Task
+    return GuessScores(Guesses,_PoolWordList,scorer)
+
+def _PoolTop(Task):
+    Guesses,limit,scorer = Task
+    return TopSuggest(Guesses,_PoolWordList,limit,scorer)
+
+
+def ParallelSuggest(Guesses,WordList,workers,limit=None,scorer='entropy'):
+    # Suggest with the guesses split across worker processes; with a
+    # limit each worker returns its own best rows, which are merged
+    parts = 4*workers if limit is None else workers # balance load vs pruning
+    size = -(-len(Guesses)//parts)
+    Chunks = [Guesses[i:i+size] for i in range(0,len(Guesses),size)]
+    Args = (WordList,HintData.File if HintData is not None else None)
+    Suggs=[]
+    with multiprocessing.Pool(workers,_PoolStart,Args) as pool:
+        if limit is None:
+            for Chunk,Hs in zip(Chunks,pool.map(_PoolScores,[(Chunk,scorer) for Chunk in Chunks])):
+                Suggs.extend([H,W] for H,W in zip(Hs,Chunk))
+        else:
+            for part in pool.map(_PoolTop,[(Chunk,limit,scorer) for Chunk in Chunks]):
+                Suggs.extend(part)
+    Suggs.sort()
+    return Suggs if limit is None else Suggs[:limit]
+
 #==========================================================
 #                   Entropy functions
 #==========================================================
@@ -162,7 +1428,37 @@ def Entropy(subtotal,total=-1):
         return (subtotal/total)*math.log(subtotal,2)
 
 
-def WhatIf(guess,WordList):
+def PartitionEntropy(Counts,total):
+    # sum smallest first, so every hint engine gives identical totals
+    H = 0
+    for count in sorted(Counts):
+        H +=Entropy(count,total)
+    return H
+
+
+def HintCounts(Row,ids):
+    # sizes of the hint partitions of the words ids, from a matrix row
+    if len(ids)>1:
+        return Counter(itemgetter(*ids)(Row)).values()
+    return [len(ids)] if ids else []
+
+
+def WhatIf(guess,WordList,ids=None):
+    # ids are WordList's HintData ids, if the caller already has them
+    return PartitionEntropy(GuessCounts(guess,WordList,ids),len(WordList))
+
+
+def GuessCounts(guess,WordList,ids=None):
+    # the sizes of the hint partitions guess makes of WordList
+    if HintData is not None and guess in HintData.Index:
+        if ids is None:
+            ids = HintData.Ids(WordList)
+        if ids is not None:
+            Row = HintData.Row(HintData.Index[guess])
+            return HintCounts(Row,ids)
+    if np is not None and WordList:
+        Codes = BatchHintCodes(EncodeWords(guess),EncodeWords(WordList))
+        return Counter(Codes.tolist()).values()
     HintDict={}
     for W in WordList:
         hint = MakeHint(W,guess)
@@ -170,16 +1466,344 @@ def WhatIf(guess,WordList):
             HintDict[hint] +=1
         else:
             HintDict[hint] =1
-    H = 0
-    for hint in HintDict:
-        count = HintDict[hint]
-        H +=Entropy(count,len(WordList))
-    return H
+    return HintDict.values()
 
 
 
 
 
+#==========================================================
+#        Play a whole game automatically
+#==========================================================
+MAX_TURNS = 20 # a safety net, real games take far fewer
+
+def PlayGame(answer,FullList,Times=None):
+    """Return the HintList of a game against answer, guessing the top
+    suggestion each turn. If Times is a list, the seconds each turn
+    took are appended to it.
+    """
+    WordList = FullList
+    HintList = []
+    solved = 'G'*len(answer)
+    while len(HintList)<MAX_TURNS and WordList:
+        start = time.perf_counter()
+        guess = Suggest(WordList,FullList,limit=1)[0][1]
+        response = MakeHint(answer,guess)
+        HintList.append([response,guess])
+        if response!=solved:
+            WordList = FilterWords(WordList,guess,response)
+        if Times is not None:
+            Times.append(time.perf_counter()-start)
+        if response==solved:
+            break
+    return HintList
+
+
+#==========================================================
+#      Batch solving: one JSON result per input line
+#==========================================================
+# An input line is a target word, which is played automatically,
+# or recorded guess and hint pairs, e.g: RAISE #Y### CLOUT GG#G#
+# which report the remaining candidates and the next suggestion.
+BATCH_WORDS = 10   # candidates listed for a recorded game
+BATCH_CHUNK = 64   # lines handed to each worker at a time
+
+def SolveLine(line,FullList):
+    """Return the result dictionary for one batch input line."""
+    Z = line.upper().split()
+    Result = {'input':line.strip()}
+    if 1==len(Z):
+        answer = Z[0]
+        if not IsLUCW(answer):
+            Result['error'] = answer+' is not a {:d}-letter word'.format(Letters)
+            return Result
+        HintList = PlayGame(answer,FullList)
+        Result['answer'] = answer
+        Result['guesses'] = [guess for response,guess in HintList]
+        Result['hints'] = [response for response,guess in HintList]
+        Result['solved'] = bool(HintList) and HintList[-1][0]=='G'*Letters
+        return Result
+    if len(Z)%2:
+        Result['error'] = 'expected a target word, or guess and hint pairs'
+        return Result
+    WordList = FullList
+    for guess,response in zip(Z[0::2],Z[1::2]):
+        if not IsLUCW(guess):
+            Result['error'] = guess+' is not a {:d}-letter word'.format(Letters)
+            return Result
+        if Letters!=len(response) or not GoodCharacters(response,'GY#'):
+            Result['error'] = 'hints are {:d} letters long, using GY# only, not: '.format(Letters)+response
+            return Result
+        WordList = FilterWords(WordList,guess,response)
+    Result['candidates'] = len(WordList)
+    Result['words'] = WordList[:BATCH_WORDS]
+    Suggs = Suggest(WordList,FullList,limit=1) if WordList else []
+    Result['suggest'] = Suggs[0][1] if Suggs else None
+    return Result
+
+
+_BatchList = None # a batch worker's word list
+
+def _BatchStart(length,filename):
+    # runs once in each worker: map the parent's hint matrix, if it has
+    # one, else load the word list as the parent did
+    global _BatchList,HintData,Letters,Workers
+    Workers = 1
+    Letters = length
+    if HintData is None and filename is not None:
+        HintData = AttachHintMatrix(filename)
+    _BatchList = HintData.Words if HintData is not None else LoadWordList()
+
+def _BatchSolve(line):
+    return SolveLine(line,_BatchList)
+
+
+def BatchSolve(Lines,FullList,workers=1):
+    """Yield the result of each game in Lines, in order.
+
+    Lines may be any iterable, e.g. an open file; it is read a chunk
+    at a time, so memory use does not grow with the input.
+    """
+    Lines = (line for line in Lines if line.strip())
+    if workers<=1:
+        for line in Lines:
+            yield SolveLine(line,FullList)
+        return
+    Args = (Letters,HintData.File if HintData is not None else None)
+    with multiprocessing.Pool(workers,_BatchStart,Args) as pool:
+        while True:
+            Chunk = list(itertools.islice(Lines,workers*BATCH_CHUNK))
+            if not Chunk:
+                break
+            yield from pool.imap(_BatchSolve,Chunk,chunksize=max(1,BATCH_CHUNK//4))
+
+
+#==========================================================
+#      Precomputed decision tree: next guess by lookup
+#==========================================================
+# A tree file holds a digest of the word list it was built for,
+# then flat arrays: node i guesses Words[Guess[i]], and its
+# children are the nodes Child[j] reached by hint code Code[j],
+# for First[i] <= j < First[i]+Count[i], sorted by code. Codes and
+# counts take a byte each, or two for words of 6 or more letters.
+TREE_MAGIC  = b'WSDT0001'
+TREE_HEADER = struct.Struct('<8s20sIIIB3x') # magic,digest,words,nodes,edges,objective
+TREE_OBJECTIVES = ['expected','worst']
+
+class DecisionTree:
+    """A guess for every (guess, hint) history the tree covers."""
+
+    def __init__(self,Words,Guess,First,Count,Code,Child,Objective=0):
+        self.Words = Words
+        self.Guess,self.First,self.Count = Guess,First,Count
+        self.Code,self.Child = Code,Child
+        self.Objective = TREE_OBJECTIVES[Objective]
+
+    def Node(self,HintList):
+        """Return the node reached by HintList, or None if it leaves the tree."""
+        node = 0
+        for response,guess in HintList:
+            if self.Words[self.Guess[node]]!=guess:
+                return None
+            first = self.First[node]
+            last = first+self.Count[node]
+            code = HintCode(response)
+            j = first + bisect.bisect_left(self.Code[first:last],code)
+            if j==last or self.Code[j]!=code:
+                return None
+            node = self.Child[j]
+        return node
+
+    def Next(self,HintList):
+        """Return the tree's next guess after HintList, or None."""
+        node = self.Node(HintList)
+        return None if node is None else self.Words[self.Guess[node]]
+
+
+def SaveTree(filename,Words,Root,Objective=0):
+    # Root is a nested (guess id, {code: child}) structure;
+    # shared subtrees are written once
+    Guess,First,Count = array('H'),array('I'),array(TreeCodeType(Words))
+    Code,Child = array(TreeCodeType(Words)),array('I')
+    Number = {}   # id(node) -> node index
+    Order = [Root]
+    Number[id(Root)] = 0
+    for node in Order: # breadth first, Order grows as we go
+        g,Children = node
+        Guess.append(g)
+        First.append(len(Code))
+        Count.append(len(Children))
+        for code in sorted(Children):
+            child = Children[code]
+            if id(child) not in Number:
+                Number[id(child)] = len(Order)
+                Order.append(child)
+            Code.append(code)
+            Child.append(Number[id(child)])
+    with open(filename+'.tmp','wb') as file:
+        file.write(TREE_HEADER.pack(TREE_MAGIC,WordListDigest(Words),len(Words),
+                                    len(Guess),len(Code),Objective))
+        for A in (Guess,First,Count,Code,Child):
+            A.tofile(file)
+    os.replace(filename+'.tmp',filename)
+    return len(Guess)
+
+
+def LoadTree(filename,Words):
+    # return the DecisionTree in filename, or None if it is missing
+    # or was built for another word list
+    try:
+        with open(filename,'rb') as file:
+            magic,digest,nwords,nodes,edges,objective = TREE_HEADER.unpack(file.read(TREE_HEADER.size))
+            if magic!=TREE_MAGIC or digest!=WordListDigest(Words) or nwords!=len(Words):
+                print(filename,'was not built for this word list.')
+                return None
+            Arrays=[]
+            for typecode,count in (('H',nodes),('I',nodes),(TreeCodeType(Words),nodes),(TreeCodeType(Words),edges),('I',edges)):
+                A = array(typecode)
+                A.fromfile(file,count)
+                Arrays.append(A)
+    except (OSError,EOFError,struct.error) as E:
+        print('could not load decision tree:',E)
+        return None
+    return DecisionTree(Words,*Arrays,Objective=objective)
+
+
+def TreeCodeType(Words):
+    # the array typecode of a tree's hint codes and counts, for Words' length
+    return 'B' if 1==CodeSize(len(Words[0]) if Words else None) else 'H'
+
+
+def TreeFile(filename):
+    return os.path.splitext(filename)[0]+'.tree'
+
+
+
+#==========================================================
+#       Counting and timing the hot paths, see PROFILE
+#==========================================================
+PROFILED = ['MakeHint','WhatIf','Entropy','Select','WordIndex.Pattern','WordIndex.Hint',
+            'GuessScores','BatchHintCodes','TopSuggest','MultiSuggest','DeepSuggest',
+            'LoadHintMatrix','LoadWordList']
+WAITING = ['AskHint'] # time spent waiting for the user, left out of commands
+
+class Profiler:
+    """Counts and times calls to the PROFILED functions, and the time
+    each REPL command takes, optionally under cProfile as well.
+
+    Functions are profiled by rebinding their names in this module (or
+    on their class, for 'Class.method') to timed wrappers, and put back
+    when profiling stops, so it costs nothing while off. Times include
+    any profiled calls made inside.
+    """
+
+    def __init__(self):
+        self.On = False
+        self.Saved = {}     # name -> the original function
+        self.Calls = {}     # name -> [calls, seconds]
+        self.Commands = {}  # command -> [runs, seconds, worst, {name:[calls,seconds]}]
+        self.Profile = None # a cProfile.Profile, when dumping
+        self.Dump = None
+        self.Current = None # (command, start time, Calls copy) while one runs
+
+    def Start(self,dump=None):
+        if self.On:
+            self.Stop()
+        for name in PROFILED+WAITING:
+            Owner,attr = ProfiledOwner(name)
+            self.Saved[name] = getattr(Owner,attr)
+            setattr(Owner,attr,self.Wrap(name,self.Saved[name]))
+        if dump:
+            self.Dump = dump
+            self.Profile = cProfile.Profile()
+            self.Profile.enable()
+        self.On = True
+
+    def Wrap(self,name,function):
+        Stat = self.Calls.setdefault(name,[0,0.0])
+        def Timed(*args,**kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args,**kwargs)
+            finally:
+                Stat[0] += 1
+                Stat[1] += time.perf_counter()-start
+        return Timed
+
+    def Stop(self):
+        """Put the original functions back; write the cProfile dump, if any."""
+        if not self.On:
+            return
+        for name,function in self.Saved.items():
+            Owner,attr = ProfiledOwner(name)
+            setattr(Owner,attr,function)
+        self.Saved = {}
+        self.On = False
+        self.Current = None
+        if self.Profile is not None:
+            self.Profile.disable()
+            try:
+                self.Profile.dump_stats(self.Dump)
+                print('(profile saved to',self.Dump+')')
+            except OSError as E:
+                print('(could not save profile:',E,')')
+            self.Profile = None
+
+    def Begin(self,command):
+        if self.On:
+            self.Current = (command,time.perf_counter(),{name:S[:] for name,S in self.Calls.items()})
+
+    def End(self):
+        # charge the time and calls since Begin to its command
+        if self.Current is None:
+            return
+        command,start,Before = self.Current
+        self.Current = None
+        waited = sum(self.Calls[name][1]-Before[name][1] for name in WAITING)
+        seconds = time.perf_counter()-start-waited
+        Stat = self.Commands.setdefault(command,[0,0.0,0.0,{}])
+        Stat[0] += 1
+        Stat[1] += seconds
+        Stat[2] = max(Stat[2],seconds)
+        for name in PROFILED:
+            calls = self.Calls[name][0]-Before[name][0]
+            if calls:
+                Inner = Stat[3].setdefault(name,[0,0.0])
+                Inner[0] += calls
+                Inner[1] += self.Calls[name][1]-Before[name][1]
+
+    def Report(self):
+        print('{:20s} {:>10s} {:>12s} {:>10s} {:>10s}'.format('command','runs','total ms','mean ms','worst ms'))
+        for command,(runs,seconds,worst,Inner) in sorted(self.Commands.items()):
+            print('{:20s} {:10,d} {:12.1f} {:10.1f} {:10.1f}'.format(
+                  command,runs,1000*seconds,1000*seconds/runs,1000*worst))
+            for name,(calls,spent) in sorted(Inner.items(),key=lambda item:-item[1][1]):
+                print('  {:18s} {:10,d} {:12.1f}'.format(name,calls,1000*spent))
+        print('{:20s} {:>10s} {:>12s}'.format('function','calls','total ms'))
+        for name in PROFILED:
+            calls,spent = self.Calls.get(name,(0,0.0))
+            print('{:20s} {:10,d} {:12.1f}'.format(name,calls,1000*spent))
+
+
+def ProfiledOwner(name):
+    # where a PROFILED name lives: (this module or its class, attribute)
+    Owner = sys.modules[__name__]
+    *path,attr = name.split('.')
+    for part in path:
+        Owner = getattr(Owner,part)
+    return Owner,attr
+
+Profile = Profiler()
+
+def ProfileFromEnvironment():
+    # WORDLE_PROFILE=1 profiles from start up; any other value is
+    # also the file the cProfile dump is written to
+    value = os.environ.get('WORDLE_PROFILE','')
+    if value not in ('','0'):
+        Profile.Start(None if '1'==value else value)
+
+
+
 #==========================================================
 #                   main program
 #==========================================================
@@ -187,20 +1811,110 @@ def WhatIf(guess,WordList):
 
 if __name__ == "__main__":
 
-    FullList = LoadWordList()
-    WordList = FullList.copy()
-    HintList=[]
+    parser = argparse.ArgumentParser(description='Tools to help solve wordle puzzles.')
+    parser.add_argument('--batch',nargs='?',const='-',metavar='FILE',
+                        help='solve the games in FILE (or stdin) without prompts, one JSON line each')
+    parser.add_argument('--workers',type=int,default=1,
+                        help='processes to use for batch games and suggestions (default: 1)')
+    parser.add_argument('--letters',type=int,default=5,choices=range(4,9),metavar='{4..8}',
+                        help='word length, 5 uses FLW.txt, others 4LW.txt, 6LW.txt ... (default: 5)')
+    args = parser.parse_args()
+    Workers = args.workers if args.workers>0 else os.cpu_count() or 1
+    Letters = args.letters
+    if not os.path.exists(WordListFile()):
+        sys.exit('no word list '+WordListFile())
+
+    if args.batch is not None:
+        ProfileFromEnvironment()
+        Profile.Begin('BATCH')
+        FullList = LoadWordList()
+        HintData = LoadHintMatrix(FullList)
+        file = sys.stdin if '-'==args.batch else open(args.batch)
+        with file:
+            for Result in BatchSolve(file,FullList,Workers):
+                print(json.dumps(Result),flush=True)
+        if Profile.On:
+            # stdout is the JSON results; the figures go to stderr
+            Profile.End()
+            with contextlib.redirect_stdout(sys.stderr):
+                Profile.Report()
+                Profile.Stop()
+        sys.exit(0)
+
+    Lengths = {} # letters -> (FullList,IndexData,HintData,SuggestMemo), loaded when first used
+
+    def UseLetters(length):
+        # play length letter words; raises OSError without a word list
+        global Letters,FullList,IndexData,HintData,SuggestMemo
+        if length not in Lengths:
+            List = LoadWordList(length=length)
+            Lengths[length] = (List,WordIndex(List),LoadHintMatrix(List),
+                               SuggestCache(filename=SuggestCacheFile(WordListFile(length))))
+        Letters = length
+        FullList,IndexData,HintData,SuggestMemo = Lengths[length]
+
+    def NewGame():
+        global WordList,WordBits,HintList,GuessBits,Boards,BoardHints,Tree
+        WordBits = IndexData.All # the candidates as an IndexData bitset
+        WordList = FullList # the candidates as words, None until Candidates() lists them
+        HintList=[]
+        GuessBits = IndexData.All # the guesses hard mode allows, see HARD
+        Boards = () # with several boards: each one's candidate bitset, None once solved
+        BoardHints = [] # (guess, the hint on each board) for TABLE
+        Tree = None # a DecisionTree answering SUGGEST, see TREE
+        History.Clear()
+
+    ProfileFromEnvironment()
+    History = GameHistory() # State() before each guess
+    Hard = False
+    UseLetters(Letters)
+    NewGame()
+
+    def State():
+        # a snapshot of the game for UNDO and REDO, see GameHistory
+        return (WordBits,WordList,GuessBits,tuple(HintList),Boards,tuple(BoardHints))
+
+    def Candidates():
+        # the candidates as a word list, only made when a command needs one
+        global WordList
+        if WordList is None:
+            WordList = IndexData.List(WordBits)
+        return WordList
+
+    def ShowWords(bits,page):
+        # print the words of bits, all of them or one page; returns how many in all
+        if page is None:
+            for W in IndexData.Iter(bits):
+                print(W)
+        else:
+            Words,pages = IndexData.Page(bits,page)
+            for W in Words:
+                print(W)
+            print('page {:d} of {:d}'.format(page,pages))
+        return BitCount(bits)
+
+    def ShowBoards(Boards):
+        for b,bits in enumerate(Boards):
+            if bits is None:
+                print('board {:d}: solved'.format(b+1))
+            else:
+                print('board {:d}: {:,d} words, entropy: {:5.2f}'.format(b+1,BitCount(bits),Entropy(BitCount(bits))))
+        print('')
 
     print(WordleSolverBanner)
-    print('(loaded {:,d} words).'.format(len(WordList)))
+    print('(loaded {:,d} words).'.format(len(FullList)))
     print('Type help for help.')
 
     while True:
-        cmd=input('>').upper()
+        Profile.End()
+        line=input('>')
+        cmd=line.upper()
         if ''==cmd:
             continue
         if 'QUIT'==cmd:
+            Profile.Stop()
             quit()
+        Profile.Begin(cmd.split()[0])
 
         #===========================================
         # HELP
@@ -215,21 +1929,75 @@ if __name__ == "__main__":
             print('      (Type cancel to get out of the hint loop).')
             print('')
             print('whatif <word>')
-            print('      Returns the expected new entropy if you guess <word>.')
+            print('      Returns the expected new entropy if you guess <word>,')
+            print('      per board and summed when playing several boards.')
             print('')
-            print('list')
-            print('      Lists each currently possible word.')
+            print('list <page>')
+            print('      Lists each currently possible word, or just page <page>')
+            print('      of them, 100 words a page (per board, with several).')
             print('')
             print('table')
             print('      Shows the current wordle table.')
             print('')
+            print('undo')
+            print('      Takes back the last guess and its hint.')
+            print('')
+            print('redo')
+            print('      Puts back the last guess undone.')
+            print('')
             print('suggest <number>')
             print('      Returns <number> best guess suggestions.')
             print('      if you leave out <number> you get 10.')
             print('')
-            print('pattern <include> <omit>')
-            print('      Finds words which match a pattern.')
-            print('      <include> is mandatory 5 letters or dots, then a comma,')
+            print('suggest deep <number>')
+            print('      Looks two guesses ahead: ranks the best few guesses by')
+            print('      the words expected to be left after their best follow-up.')
+            print('')
+            print('workers <number>')
+            print('      Sets how many processes suggest may use (0 means all')
+            print('      cores). Small candidate lists always use one.')
+            print('')
+            print('profile on <file>|off|show')
+            print('      Counts and times makehint, whatif, entropy, select, the')
+            print('      pattern and hint filters, the suggest scoring (guessscores,')
+            print('      batchhintcodes, topsuggest, multisuggest, deepsuggest) and')
+            print('      the word list and hint matrix loads, per command; show')
+            print('      prints the figures.')
+            print('      With <file>, a cProfile dump is written there when it stops.')
+            print('      (WORDLE_PROFILE=1 or =<file> profiles from start up, and')
+            print('      in --batch runs reports to stderr at the end.)')
+            print('')
+            print('letters <number>')
+            print('      Starts a new game with <number> letter words, 4 to 8.')
+            print('      Five letter words are in FLW.txt, others in 4LW.txt, 6LW.txt ...')
+            print('')
+            print('boards <number>')
+            print('      Starts a game on <number> boards at once (quordle is 4,')
+            print('      octordle 8); guess asks for the hint on each board, and')
+            print('      suggest scores guesses over all of them. boards 1 goes back.')
+            print('')
+            print('hard on|off')
+            print('      In hard mode suggest only offers guesses which keep')
+            print('      every green, use every letter found, and no letter ruled out.')
+            print('')
+            print('score <name>')
+            print('      Sets how suggest ranks guesses: entropy (the default),')
+            print('      maxbucket (the largest hint, the worst case), or expected')
+            print('      (the number of words expected to be left).')
+            print('')
+            print('tree <file>')
+            print('      Makes suggest follow a decision tree built by WordleTree.py.')
+            print('      <file> defaults to FLW.tree (6LW.tree ... for other letters,')
+            print('      see WordleTree.py --letters); tree off goes back to entropy.')
+            print('')
+            print('cache')
+            print('      Shows suggestion cache statistics.')
+            print('      cache clear empties it, on disk too (FLW.suggest).')
+            print('')
+            print('pattern <include> <omit> <page>')
+            print('      Finds words which match a pattern, all of them, or just')
+            print('      page <page> of them (per board, with several).')
+            print('      <include> is mandatory letters or dots, one per letter, then a comma,')
             print('                 then optional letters to include anywhere.')
             print('      <omit> is optional. If used, it starts with a minus sign,')
             print('             followed by letters to omit.')
@@ -246,122 +2014,281 @@ if __name__ == "__main__":
         # WHATIF
         if cmd.startswith('WHATIF '):
             word = cmd[7:].strip()
-            if not Is5LUCW(word):
-                print(word,' is not a 5-letter word')
+            if not IsLUCW(word):
+                print(word,' is not a {:d}-letter word'.format(Letters))
                 continue
-            H0 = Entropy(len(WordList))
-            Ht = WhatIf(word,WordList)
-            fmt = word+' Entropy: {:5.2f}->{:5.2f}, {:6.2f}\n'
-            print(fmt.format(H0,Ht,Ht-H0))
+            fmt = word+' Entropy: {:5.2f}->{:5.2f}, {:6.2f}'
+            if Boards:
+                # each unsolved board, then their sum, as suggest scores them
+                H0 = Ht = 0
+                for b,bits in enumerate(Boards):
+                    if bits is not None:
+                        h0,ht = Entropy(BitCount(bits)),WhatIf(word,IndexData.List(bits))
+                        print('board {:d}: '.format(b+1)+fmt.format(h0,ht,ht-h0))
+                        H0,Ht = H0+h0,Ht+ht
+                print('all boards: '+fmt.format(H0,Ht,Ht-H0)+'\n')
+                continue
+            H0 = Entropy(BitCount(WordBits))
+            Ht = WhatIf(word,Candidates())
+            print(fmt.format(H0,Ht,Ht-H0)+'\n')
             continue
 
         #===========================================
         # GUESS
         if cmd.startswith('GUESS '):
             guess = cmd[6:].strip().upper()
-            if not Is5LUCW(guess):
-                print(guess,' is not a 5-letter word')
+            if not IsLUCW(guess):
+                print(guess,' is not a {:d}-letter word'.format(Letters))
+                continue
+            if Hard and guess in IndexData.Ids and not GuessBits>>IndexData.Ids[guess] & 1:
+                print('(hard mode does not allow',guess+')')
+            if Boards:
+                Responses = []
+                for b,bits in enumerate(Boards):
+                    response = None
+                    if bits is not None:
+                        response = AskHint(guess,'>hint for board {:d}? '.format(b+1))
+                        if response is None:
+                            break
+                    Responses.append(response)
+                if len(Responses)<len(Boards):
+                    continue # cancelled
+                History.Push(State())
+                BoardHints.append((guess,Responses))
+                Boards = tuple(None if bits is None or 'G'*Letters==response else bits & IndexData.Hint(guess,response)
+                               for bits,response in zip(Boards,Responses))
+                ShowBoards(Boards)
                 continue
-            OldN = len(WordList)
-            OldH = Entropy(OldN)
-            Cancelled = False
-            while not Cancelled:
-                Hint=[]
-                response=input('>hint? ').upper()
-                if response=='CANCEL':
-                    Cancelled=True
-                    break
-
-                if 5!=len(response) or not GoodCharacters(response,'GY#'):
-                    print('hints are 5 letters long, using GY# only, not:',response)
-                    continue
 
-                Hint=[response,guess]
-                for i in range(5):
-                    Show(response[i],guess[i])
-                print('')
-                yesno = input('Is that correct? (Y/N): ').upper()
-                if yesno.startswith('Y'):
-                    HintList.append(Hint)
-                    break
-            if Cancelled:
+            OldN = BitCount(WordBits)
+            OldH = Entropy(OldN)
+            response = AskHint(guess)
+            if response is None:
                 continue
 
-            WL=[]
-            for Word in WordList:
-                #if Filter(Word,response,guess):
-                if response == MakeHint(Word,guess):
-                    WL.append(Word)
-            WordList = WL
+            History.Push(State())
+            HintList.append([response,guess])
+            WordBits &= IndexData.Hint(guess,response)
+            WordList = None # listed when needed
+            GuessBits &= IndexData.HardGuesses(guess,response) # kept up even when off
 
-            NewN = len(WordList)
+            NewN = BitCount(WordBits)
             NewH = Entropy(NewN)
             print('Old Entropy: {:5.2f} {:,d} words'.format(OldH,OldN))
             print('New Entropy: {:5.2f} {:,d} words'.format(NewH,NewN))
             print('')
             continue
 
+        #===========================================
+        # UNDO, REDO
+        if 'UNDO'==cmd or 'REDO'==cmd:
+            state = History.Back(State()) if 'UNDO'==cmd else History.Forward(State())
+            if state is None:
+                print('Nothing to '+cmd.lower()+'.')
+                continue
+            WordBits,WordList,GuessBits,Hints,Boards,Rows = state
+            HintList = list(Hints)
+            BoardHints = list(Rows)
+            if Boards:
+                ShowBoards(Boards)
+                continue
+            print('Now {:d} guesses, entropy: {:5.2f} {:,d} words'.format(
+                  len(HintList),Entropy(BitCount(WordBits)),BitCount(WordBits)))
+            print('')
+            continue
+
         #===========================================
         # LIST
         if cmd.startswith('LIST'):
-            for W in WordList:
-                print(W)
-            print('{:d} words'.format(len(WordList)))
+            try:
+                Z,page = ParsePage(cmd.split()[1:])
+            except ValueError as E:
+                print(E)
+                continue
+            if Boards:
+                for b,bits in enumerate(Boards):
+                    if bits is not None:
+                        print('board {:d}:'.format(b+1))
+                        print('{:d} words'.format(ShowWords(bits,page)))
+                print('')
+                continue
+            print('{:d} words'.format(ShowWords(WordBits,page)))
             print('')
             continue
 
         #===========================================
         # PATTERN
         if cmd.startswith('PATTERN'):
-            Z = cmd.split()
-            if len(Z)<2:
-                print('select needs a pattern!')
+            try:
+                Z,page = ParsePage(cmd.split()[1:])
+                Mask,Incl,Omit = ParsePattern(Z)
+            except ValueError as E:
+                print(E)
                 continue
-            MI = Z[1].split(',')
 
-            if len(MI)<1 or len(MI[0])!=5:
-                print('missing/invalid select <include> pattern.')
-                continue
-            Mask=MI[0]
-            if not GoodCharacters(Mask,'.'+CAPS):
-                print('invalid characters in',Mask,'<include> pattern.')
+            bits = IndexData.Pattern(Mask,Incl,Omit)
+            if Boards:
+                for b,board in enumerate(Boards):
+                    if board is not None:
+                        print('board {:d}:'.format(b+1))
+                        print('Found',ShowWords(board & bits,page),'words')
+                print('')
                 continue
+            print('Found',ShowWords(WordBits & bits,page),'words')
+            print('')
+            continue
 
-            Incl=''
-            if len(MI)>1:
-                Incl=MI[1]
-            if not GoodCharacters(Incl,CAPS):
-                print('invalid characters in',Incl,'<include> pattern.')
+        #===========================================
+        # TABLE
+        if cmd.startswith('TABLE'):
+            if Boards:
+                for guess,Responses in BoardHints:
+                    for response in Responses:
+                        if response is None: # solved already
+                            print(' '*(len(guess)+1),end='')
+                            continue
+                        for i in range(len(guess)):
+                            Show(response[i],guess[i])
+                        print(' ',end='')
+                    print('')
+                print('')
                 continue
+            for Hint in HintList:
+                response,guess = Hint
+                for i in range(len(guess)):
+                        Show(response[i],guess[i])
+                print('')
+            print('')
+            continue
 
-            Omit=''
-            if len(Z)>2:
-                Omit=Z[2]
-                if '-' != Omit[0]:
-                    print('select <omit> string should start with a - sign.')
+        #===========================================
+        # WORKERS
+        if cmd.startswith('WORKERS'):
+            Z = cmd.split()
+            if len(Z)>1:
+                try:
+                    Workers=int(Z[1])
+                except ValueError:
+                    print(Z[1],' is not a number!')
                     continue
-                Omit=Omit[1:]
-            if not GoodCharacters(Omit,CAPS):
-                print('invalid characters in',Omit,'<omit> pattern.')
+                if Workers<1:
+                    Workers=os.cpu_count() or 1
+            print('suggest uses up to {:d} worker(s).'.format(Workers))
+            print('')
+            continue
+
+        #===========================================
+        # TREE
+        if cmd.startswith('TREE'):
+            Z = cmd.split()
+            if len(Z)>1 and 'OFF'==Z[1]:
+                Tree = None
+                print('suggest uses entropy.')
+                print('')
                 continue
+            filename = TreeFile(WordListFile())
+            if len(Z)>1:
+                filename = line.strip()[4:].strip() # keep the file name's case
+            Tree = LoadTree(filename,FullList)
+            if Tree is not None:
+                print('suggest uses the decision tree in',filename,
+                      '({:,d} nodes, {} guesses).'.format(len(Tree.Guess),Tree.Objective))
+            print('')
+            continue
 
-            count=0
-            for Word in WordList:
-                if Select(Word,Mask,Incl,Omit):
-                    print(Word)
-                    count +=1
-            print('Found',count,'words')
+        #===========================================
+        # PROFILE
+        if cmd.startswith('PROFILE'):
+            Z = line.split()
+            if len(Z)>1 and 'ON'==Z[1].upper():
+                Profile.Start(Z[2] if len(Z)>2 else None)
+            elif len(Z)>1 and 'OFF'==Z[1].upper():
+                Profile.Stop()
+            elif len(Z)>1 and 'SHOW'==Z[1].upper():
+                Profile.Report()
+            print('profiling is','on.' if Profile.On else 'off.')
             print('')
             continue
 
         #===========================================
-        # TABLE
-        if cmd.startswith('TABLE'):
-            for Hint in HintList:
-                response,guess = Hint
-                for i in range(5):
-                        Show(response[i],guess[i])
+        # LETTERS
+        if cmd.startswith('LETTERS'):
+            Z = cmd.split()
+            if len(Z)>1:
+                try:
+                    n=int(Z[1])
+                except ValueError:
+                    print(Z[1],' is not a number!')
+                    continue
+                if n<4 or n>8:
+                    print('words may have 4 to 8 letters.')
+                    continue
+                try:
+                    UseLetters(n)
+                except OSError:
+                    print('no word list',WordListFile(n))
+                    continue
+                NewGame()
+            print('playing {:d}-letter words, {:,d} of them.'.format(Letters,len(FullList)))
+            print('')
+            continue
+
+        #===========================================
+        # BOARDS
+        if cmd.startswith('BOARDS'):
+            Z = cmd.split()
+            if len(Z)>1:
+                try:
+                    n=int(Z[1])
+                except ValueError:
+                    print(Z[1],' is not a number!')
+                    continue
+                History.Clear()
+                Boards = (IndexData.All,)*n if n>1 else ()
+                BoardHints = []
+            if Boards:
+                ShowBoards(Boards)
+            else:
+                print('playing one board.')
                 print('')
+            continue
+
+        #===========================================
+        # HARD
+        if cmd.startswith('HARD'):
+            Z = cmd.split()
+            if len(Z)>1:
+                if Z[1] not in ('ON','OFF'):
+                    print('use: hard on, or hard off')
+                    continue
+                Hard = 'ON'==Z[1]
+            if Hard:
+                print('hard mode is on, {:,d} words may be guessed.'.format(BitCount(GuessBits)))
+            else:
+                print('hard mode is off.')
+            print('')
+            continue
+
+        #===========================================
+        # SCORE
+        if cmd.startswith('SCORE'):
+            Z = line.lower().split()
+            if len(Z)>1:
+                if Z[1] not in SCORERS:
+                    print(Z[1],' is not one of:',', '.join(SCORERS))
+                    continue
+                Scoring = Z[1]
+            print('suggest ranks guesses by',Scoring)
+            print('')
+            continue
+
+        #===========================================
+        # CACHE
+        if cmd.startswith('CACHE'):
+            Z = cmd.split()
+            if len(Z)>1 and 'CLEAR'==Z[1]:
+                SuggestMemo.Clear()
+            print(SuggestMemo.Report())
             print('')
             continue
 
@@ -369,6 +2296,9 @@ if __name__ == "__main__":
         # SUGGEST
         if cmd.startswith('SUGGEST'):
             Z = cmd.split()
+            deep = len(Z)>1 and 'DEEP'==Z[1]
+            if deep:
+                del Z[1]
             limit=10
             if len(Z)>1:
                 try:
@@ -376,12 +2306,44 @@ if __name__ == "__main__":
                 except ValueError:
                     print(Z[1],' is not a number!')
                     continue
-            Suggs=Suggest(WordList,FullList)
-            Suggs=Suggs[:limit]
+            if Boards:
+                Lists = [IndexData.List(bits) for bits in Boards if bits is not None]
+                H0 = sum(Entropy(len(L)) for L in Lists)
+                for H,guess in MultiSuggest(Lists,FullList,limit):
+                    fmt = guess+' Entropy: {:5.2f}->{:5.2f}, {:6.2f} (all boards)'
+                    print(fmt.format(H0,H,H-H0))
+                print('')
+                continue
+            Pool = IndexData.List(GuessBits) if Hard else FullList
+            WordList = Candidates()
+            if deep:
+                if HintData is None:
+                    print('suggest deep needs the hint matrix, which is not kept for {:,d} words.'.format(len(FullList)))
+                for left,guess in DeepSuggest(WordList,Pool,limit=limit):
+                    print(guess+' Left after two guesses: {:8.2f} of {:,d} words'.format(left,len(WordList)))
+                print('')
+                continue
+            if Tree is not None:
+                guess = Tree.Next(HintList)
+                if guess is not None and Hard and not GuessBits>>IndexData.Ids[guess] & 1:
+                    guess = None # the tree does not play hard mode
+                if guess is not None:
+                    H = WhatIf(guess,WordList)
+                    H0 = Entropy(len(WordList))
+                    fmt = guess+' Entropy: {:5.2f}->{:5.2f}, {:6.2f} (decision tree)'
+                    print(fmt.format(H0,H,H-H0))
+                    print('')
+                    continue
+                print('(off the decision tree, suggesting by entropy)')
+            Suggs=Suggest(WordList,Pool,limit=limit)
             H0 = Entropy(len(WordList))
             for S in Suggs:
-                fmt = S[1]+' Entropy: {:5.2f}->{:5.2f}, {:6.2f}'
-                print(fmt.format(H0,S[0],S[0]-H0))
+                if 'entropy'==Scoring:
+                    fmt = S[1]+' Entropy: {:5.2f}->{:5.2f}, {:6.2f}'
+                    print(fmt.format(H0,S[0],S[0]-H0))
+                else:
+                    fmt = S[1]+' '+SCORERS[Scoring].Label+': {:8.2f} of {:,d} words'
+                    print(fmt.format(S[0],len(WordList)))
             print('')
             continue
 
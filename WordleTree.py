@@ -0,0 +1,186 @@
+WordleTreeBanner = 'WordleTree.py v1.0 GnuGPL3 Copyright (c) 2022 David Spaughton'
+
+"""
+This program is free software: you can redistribute it and/or modify it under the terms of the GNU
+General Public License as published by the Free Software Foundation, either version 3 of the License,
+or (at your option) any later version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without
+even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with this program.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+"""
+Builds a decision tree for WordleSolver.py's tree command, offline.
+
+Every word in FLW.txt (or 4LW.txt, 6LW.txt ... with --letters) may
+be guessed; the answers are that list too, unless an answer list is
+given. At each node the best few guesses
+by entropy are tried (the beam), each hint partition is solved the
+same way, and the guess with the fewest total guesses (or the lowest
+worst case) is kept. Identical candidate sets are solved once, and a
+guess is abandoned as soon as a bound shows it cannot win.
+
+usage: WordleTree.py [-a ANSWERS] [-o FILE] [--beam 4,2,1] [--worst] [--letters 5]
+"""
+
+import sys
+import os
+import time
+import argparse
+
+import WordleSolver as WS
+
+np = WS.np
+
+
+class TreeBuilder:
+    """Search for a decision tree over candidate word ids.
+
+    A node is (guess id, {hint code: child node}). Costs are pairs
+    (total guesses over all answers, worst depth), compared in that
+    order, or the other way round when building for the worst case.
+    """
+
+    def __init__(self,Matrix,Beam,Worst=False):
+        self.Matrix = Matrix.Array
+        self.Beam = Beam
+        self.Worst = Worst
+        self.Memo = {} # candidate ids (bytes) -> (cost, node)
+        self.AllGreen = WS.HintCount(len(Matrix.Words[0]))-1
+
+    def Key(self,cost):
+        total,depth = cost
+        return (depth,total) if self.Worst else (total,depth)
+
+    def Partition(self,g,cands):
+        # the candidates split by the hint guess g would get, largest first;
+        # each part keeps its ids in ascending order
+        codes = self.Matrix[g,cands]
+        order = np.argsort(codes,kind='stable')
+        codes = codes[order]
+        cuts = np.flatnonzero(np.diff(codes))+1
+        starts = [0]+cuts.tolist()
+        ends = cuts.tolist()+[len(cands)]
+        Parts = [(int(codes[a]),cands[order[a:b]]) for a,b in zip(starts,ends)]
+        Parts.sort(key=lambda part:-len(part[1]))
+        return Parts
+
+    def Guesses(self,cands,depth):
+        # the beam: the best guesses by entropy, plus the best candidate
+        width = self.Beam[min(depth,len(self.Beam)-1)]
+        Hs = WS.CodeEntropies(self.Matrix[:,cands],len(cands))
+        best = np.argsort(Hs,kind='stable')[:width].tolist()
+        inside = int(cands[np.argmin(Hs[cands])])
+        if inside not in best:
+            best.append(inside)
+        return best
+
+    def Solve(self,cands,depth=0):
+        """Return ((total, depth), node) for the sorted id array cands."""
+        key = cands.tobytes()
+        if key in self.Memo:
+            return self.Memo[key]
+        n = len(cands)
+        if 1==n:
+            result = ((1,1),(int(cands[0]),{}))
+        elif 2==n:
+            a,b = int(cands[0]),int(cands[1])
+            result = ((3,2),(a,{int(self.Matrix[a,b]):(b,{})}))
+        else:
+            result = None
+            for g in self.Guesses(cands,depth):
+                Parts = self.Partition(g,cands)
+                if 1==len(Parts) and Parts[0][0]!=self.AllGreen:
+                    continue # learns nothing
+                # lower bounds: each answer needs a guess, all but one need two
+                Bound = {code:(2*len(part)-1,1 if 1==len(part) else 2)
+                         for code,part in Parts if code!=self.AllGreen}
+                Children = {}
+                for code,part in Parts:
+                    if code==self.AllGreen:
+                        continue
+                    if result is not None and self.Key(self.Cost(n,Bound))>=self.Key(result[0]):
+                        break # cannot beat the best guess so far
+                    Bound[code],Children[code] = self.Solve(part,depth+1)
+                else:
+                    cost = self.Cost(n,Bound)
+                    if result is None or self.Key(cost)<self.Key(result[0]):
+                        result = (cost,(g,Children))
+        self.Memo[key] = result
+        return result
+
+    def Cost(self,n,Costs):
+        # cost of a node guessing for n candidates with these child costs
+        total = n + sum(c[0] for c in Costs.values())
+        depth = 1 + max((c[1] for c in Costs.values()),default=0)
+        return (total,depth)
+
+
+def Play(Tree,answer):
+    # the guesses the tree makes for answer
+    HintList=[]
+    while True:
+        guess = Tree.Next(HintList)
+        if guess is None:
+            return None
+        response = WS.MakeHint(answer,guess)
+        HintList.append([response,guess])
+        if response=='G'*len(answer):
+            return [guess for response,guess in HintList]
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Build a decision tree for WordleSolver.py.')
+    parser.add_argument('-a','--answers',help='file of possible answers (default: the word list)')
+    parser.add_argument('-o','--output',help='tree file (default: FLW.tree, 6LW.tree ...)')
+    parser.add_argument('--beam',default='4,2,1',
+                        help='guesses tried at each depth, the last repeats (default: 4,2,1)')
+    parser.add_argument('--worst',action='store_true',help='minimise the worst case, not the average')
+    parser.add_argument('--letters',type=int,default=5,choices=range(4,9),metavar='{4..8}',
+                        help='word length, 5 uses FLW.txt, others 4LW.txt, 6LW.txt ... (default: 5)')
+    args = parser.parse_args()
+
+    print(WordleTreeBanner)
+    if np is None:
+        sys.exit('WordleTree.py needs numpy.')
+    WS.Letters = args.letters
+    if not os.path.exists(WS.WordListFile()):
+        sys.exit('no word list '+WS.WordListFile())
+    FullList = WS.LoadWordList()
+    HintData = WS.LoadHintMatrix(FullList)
+    if HintData is None:
+        sys.exit('WordleTree.py needs the hint matrix, which is not kept for over {:,d} words.'.format(WS.MATRIX_LIMIT))
+    Answers = FullList
+    if args.answers:
+        with open(args.answers) as file:
+            Answers = [line.strip().upper() for line in file if line.strip()]
+    Unknown = [W for W in Answers if W not in HintData.Index]
+    if Unknown:
+        sys.exit('answers not in {}: '.format(os.path.basename(WS.WordListFile()))+' '.join(Unknown[:10]))
+    Beam = [int(b) for b in args.beam.split(',')]
+    filename = args.output or WS.TreeFile(WS.WordListFile())
+
+    start = time.time()
+    Builder = TreeBuilder(HintData,Beam,args.worst)
+    cands = np.array(sorted({HintData.Index[W] for W in Answers}))
+    (total,depth),Root = Builder.Solve(cands)
+    nodes = WS.SaveTree(filename,FullList,Root,1 if args.worst else 0)
+    print('built in {:.1f}s: {:,d} answers, {:.4f} guesses on average, at most {:d}.'.format(
+          time.time()-start,len(cands),total/len(cands),depth))
+    print('saved {:,d} nodes to {}.'.format(nodes,filename))
+
+    # check the saved tree solves every answer
+    Tree = WS.LoadTree(filename,FullList)
+    Spread = {}
+    for answer in Answers:
+        Guesses = Play(Tree,answer)
+        if Guesses is None:
+            sys.exit('the saved tree does not solve '+answer)
+        Spread[len(Guesses)] = Spread.get(len(Guesses),0)+1
+    for n in sorted(Spread):
+        print('{:2d} guesses: {:6,d}'.format(n,Spread[n]))
@@ -0,0 +1,294 @@
+"""
+The spatial module indexes 3D points for fast neighbour queries.
+
+Class KDTree holds a k-d tree over points given as a VectorArray,
+a list of vectors, or an N by 3 array (e.g. the vertices from
+vector.ReadObj or vector.LoadObj), and answers:
+    nearest(P,k)     the k points nearest to P
+    within(P,r)      the points within distance r of P
+    within_box(L,H)  the points in the axis-aligned box from L to H
+and nearest_many and within_many do the same for each of many points
+(a loop over the single-point queries, for convenience, not speed).
+
+Points are known by their index in the list (or array) the tree was
+built from. The spatial module needs numpy.
+"""
+
+
+
+# import sys
+# sys.path.append(PATH-TO-THIS-FILE)
+# import spatial as ...
+
+import math
+import heapq
+
+from vector import Vector, VectorArray, MakeVectorArray, np
+
+
+LEAF_SIZE = 64 # most points in a leaf; each leaf is searched with numpy
+
+
+class KDTree:
+    """A class to represent a k-d tree over 3-D points.
+
+    The tree is built once, splitting the points at the median of the
+    axis along which they spread most until at most LEAF_SIZE points
+    remain. Each node keeps the bounding box of its points, so a query
+    skips every node whose box is too far away, and only searches the
+    few leaves near it, with one numpy calculation per leaf.
+
+    Methods:
+    --------
+    nearest(P, k=1):
+        Return (distances, indices) of the k points nearest to P,
+        nearest first
+
+    within(P, r):
+        Return the indices of the points within distance r of P
+
+    within_box(Low, High):
+        Return the indices of the points with Low <= point <= High,
+        in each of x, y and z
+
+    nearest_many(Points, k=1), within_many(Points, r):
+        As nearest and within, for each of many points; these loop
+        over the points in Python, one query each
+
+    Queries take P as a Vector, or as any x,y,z sequence. Indices are
+    into the points the tree was built from; within and within_box
+    return them in ascending order.
+        e.g:
+        T = spatial.KDTree(vec.ReadObj('scan.obj').vertices)
+        T.nearest(vec.Vector(0,0,0))    -> (array([0.0123]), array([5012]))
+        T.within(vec.Vector(0,0,0),0.1) -> array([  17, 5012, 90210])
+    """
+
+
+    def __init__(self,points,leaf=None):
+        """
+    Creates a k-d tree.
+
+    points may be a VectorArray, a list of Vectors, or an N by 3 array.
+    leaf is the most points a leaf may hold (default LEAF_SIZE).
+    """
+        if np is None:
+            raise ImportError('KDTree needs numpy.')
+        leaf = max(1,leaf or LEAF_SIZE)
+        P = _Points(points)
+        order = np.arange(len(P))
+        # node n holds points lo[n]:hi[n] (in tree order); a leaf has
+        # axis -1, other nodes split on axis at split, below going left
+        self.lo,self.hi,self.axis,self.split,self.left,self.right,self.box = [],[],[],[],[],[],[]
+        Todo = [(0,len(P),-1,None)] if len(P) else [] # lo, hi, parent, side
+        while Todo:
+            lo,hi,parent,side = Todo.pop()
+            node = len(self.lo)
+            if parent>=0:
+                side[parent] = node
+            sub = P[order[lo:hi]]
+            low,high = sub.min(axis=0),sub.max(axis=0)
+            self.lo.append(lo)
+            self.hi.append(hi)
+            self.box.append((low.tolist(),high.tolist()))
+            self.left.append(-1)
+            self.right.append(-1)
+            if hi-lo<=leaf or (low==high).all():
+                self.axis.append(-1)
+                self.split.append(0.0)
+                continue
+            axis = int(np.argmax(high-low))
+            mid = (lo+hi)//2
+            order[lo:hi] = order[lo:hi][np.argpartition(sub[:,axis],mid-lo)]
+            self.axis.append(axis)
+            self.split.append(float(P[order[mid],axis]))
+            Todo.append((mid,hi,node,self.right))
+            Todo.append((lo,mid,node,self.left))
+        self.points = P[order]    # the points in tree order, each node's contiguous
+        self.index = order        # each of those points' original index
+
+
+    def __len__(self):
+        return len(self.points)
+
+
+    def __repr__(self):
+        return 'KDTree({:,d} points, {:,d} nodes)'.format(len(self.points),len(self.lo))
+
+
+    def nearest(self,P,k=1):
+        """Return (distances, indices), arrays of the k points nearest to P, nearest first.
+    (Fewer if the tree has fewer than k points, none if k<1.)
+    e.g:
+    T = KDTree([Vector(0,0,0), Vector(1,0,0), Vector(5,5,5)])
+    T.nearest(Vector(0.9,0,0))    -> (array([0.1]), array([1]))
+    T.nearest(Vector(0.9,0,0),2)  -> (array([0.1, 0.9]), array([1, 0]))
+    """
+        x,y,z = _Point(P)
+        if k<1:
+            return np.zeros(0),self.index[:0]
+        p = np.array((x,y,z))
+        Best = []           # (-squared distance, tree position), the k best so far
+        worst = math.inf    # the squared distance to beat
+        Todo = [0] if self.lo else []
+        while Todo:
+            node = Todo.pop()
+            if _BoxDistance(self.box[node],x,y,z)>=worst:
+                continue
+            axis = self.axis[node]
+            if axis>=0:
+                # visit the side P is on first, so the other is often skipped
+                if (x,y,z)[axis]<self.split[node]:
+                    Todo.append(self.right[node])
+                    Todo.append(self.left[node])
+                else:
+                    Todo.append(self.left[node])
+                    Todo.append(self.right[node])
+                continue
+            lo = self.lo[node]
+            D = self.points[lo:self.hi[node]]-p
+            D = np.einsum('ij,ij->i',D,D)
+            if 1==k:
+                j = int(D.argmin())
+                if D[j]<worst:
+                    worst = float(D[j])
+                    Best = [(-worst,lo+j)]
+                continue
+            for j in np.flatnonzero(D<worst).tolist():
+                if len(Best)<k:
+                    heapq.heappush(Best,(-float(D[j]),lo+j))
+                elif D[j]<worst:
+                    heapq.heapreplace(Best,(-float(D[j]),lo+j))
+                if len(Best)==k:
+                    worst = -Best[0][0]
+        Best.sort(reverse=True)
+        return (np.sqrt([-d for d,j in Best]).reshape(-1),
+                self.index[[j for d,j in Best]])
+
+
+    def within(self,P,r):
+        """Return an array of the indices of the points within distance r of P, ascending.
+    e.g:
+    T = KDTree([Vector(0,0,0), Vector(1,0,0), Vector(5,5,5)])
+    T.within(Vector(0,0,0),1.5) -> array([0, 1])
+    """
+        x,y,z = _Point(P)
+        p = np.array((x,y,z))
+        rr = r*r
+        Found = []
+        Todo = [0] if self.lo else []
+        while Todo:
+            node = Todo.pop()
+            Box = self.box[node]
+            if _BoxDistance(Box,x,y,z)>rr:
+                continue
+            lo,hi = self.lo[node],self.hi[node]
+            if _BoxFarthest(Box,x,y,z)<=rr:
+                Found.append(self.index[lo:hi]) # all of it is inside
+                continue
+            if self.axis[node]>=0:
+                Todo.append(self.left[node])
+                Todo.append(self.right[node])
+                continue
+            D = self.points[lo:hi]-p
+            D = np.einsum('ij,ij->i',D,D)
+            Found.append(self.index[lo:hi][D<=rr])
+        return _Sorted(Found)
+
+
+    def within_box(self,Low,High):
+        """Return an array of the indices of the points in a box, ascending.
+    The box is axis-aligned, from corner Low to corner High (inclusive).
+    e.g:
+    T = KDTree([Vector(0,0,0), Vector(1,0,0), Vector(5,5,5)])
+    T.within_box(Vector(-1,-1,-1),Vector(2,2,2)) -> array([0, 1])
+    """
+        low = _Point(Low)
+        high = _Point(High)
+        Found = []
+        Todo = [0] if self.lo else []
+        while Todo:
+            node = Todo.pop()
+            bl,bh = self.box[node]
+            if any(bh[i]<low[i] or bl[i]>high[i] for i in range(3)):
+                continue # no overlap
+            lo,hi = self.lo[node],self.hi[node]
+            if all(low[i]<=bl[i] and bh[i]<=high[i] for i in range(3)):
+                Found.append(self.index[lo:hi]) # all of it is inside
+                continue
+            if self.axis[node]>=0:
+                Todo.append(self.left[node])
+                Todo.append(self.right[node])
+                continue
+            Q = self.points[lo:hi]
+            Found.append(self.index[lo:hi][((Q>=low) & (Q<=high)).all(axis=1)])
+        return _Sorted(Found)
+
+
+    def nearest_many(self,Points,k=1):
+        """Return (distances, indices), each an N by k array, for the k points
+    nearest to each of N points (given as for KDTree), nearest first.
+    Where the tree has fewer than k points, distances are inf and indices -1.
+    A convenience loop over nearest(), one query per point.
+    """
+        Q = _Points(Points)
+        k = max(0,k)
+        Dist = np.full((len(Q),k),math.inf)
+        Index = np.full((len(Q),k),-1,dtype=self.index.dtype)
+        for n,P in enumerate(Q.tolist()):
+            D,I = self.nearest(P,k)
+            Dist[n,:len(D)] = D
+            Index[n,:len(I)] = I
+        return Dist,Index
+
+
+    def within_many(self,Points,r):
+        """Return a list with, for each of the points (given as for KDTree),
+    the array of indices within distance r of it, as within() does.
+    A convenience loop over within(), one query per point.
+    """
+        return [self.within(P,r) for P in _Points(Points).tolist()]
+
+
+
+
+def _Points(points):
+    # points as an N by 3 float array
+    if isinstance(points,VectorArray):
+        return np.ascontiguousarray(points.xyz.T)
+    if isinstance(points,np.ndarray):
+        return np.array(points,dtype=float).reshape(-1,3)
+    return np.ascontiguousarray(MakeVectorArray(points).xyz.T)
+
+
+def _Point(P):
+    # a Vector or x,y,z sequence as a tuple of floats
+    if isinstance(P,Vector):
+        return (float(P.x),float(P.y),float(P.z))
+    x,y,z = P
+    return (float(x),float(y),float(z))
+
+
+def _BoxDistance(Box,x,y,z):
+    # squared distance from (x,y,z) to the nearest point of Box
+    (lx,ly,lz),(hx,hy,hz) = Box
+    dx = lx-x if x<lx else (x-hx if x>hx else 0.0)
+    dy = ly-y if y<ly else (y-hy if y>hy else 0.0)
+    dz = lz-z if z<lz else (z-hz if z>hz else 0.0)
+    return dx*dx + dy*dy + dz*dz
+
+
+def _BoxFarthest(Box,x,y,z):
+    # squared distance from (x,y,z) to the farthest corner of Box
+    (lx,ly,lz),(hx,hy,hz) = Box
+    dx = max(x-lx,hx-x)
+    dy = max(y-ly,hy-y)
+    dz = max(z-lz,hz-z)
+    return dx*dx + dy*dy + dz*dz
+
+
+def _Sorted(Found):
+    # the index arrays in Found, joined and sorted
+    if not Found:
+        return np.zeros(0,dtype=int)
+    return np.sort(np.concatenate(Found))
@@ -3,6 +3,12 @@ The vector module implements basic 3D vectors.
 
 Class Vector implements 3D vectors.
 
+Class VectorArray holds many 3D vectors in numpy arrays,
+and does the Vector operations on all of them at once.
+
+Function MakeVectorArray(Vectors) makes a VectorArray
+from a list of vectors (or an N by 3 array).
+
 Function MakeVector(text,sep='') takes text
 and returns the vector that it specifies.
 
@@ -10,8 +16,22 @@ Function MakeDir(elevation,azimuth) makes
 a new unit vector pointing towards an elevation and azimuth
 (see the function documentation for details).
 
+Class Rotation holds a 3D rotation, as a quaternion and a
+matrix, to be built once and applied to many vectors.
+
+Functions MakeRotation(axis,angle), MakeDirRotation(elevation,azimuth)
+and ComposeRotations(Rotations) make Rotations.
+
 Function LoadObj(filename) returns a list of
 the 3D vectors found in a wavefront OBJ file.
+
+Function StreamObj(filename) yields the vectors of a
+wavefront OBJ file as VectorArrays, a chunk at a time,
+for files too big to hold at once.
+
+Function ReadObj(filename) returns an ObjMesh holding
+the vertices, normals, texture coordinates and faces
+of a wavefront OBJ file in numpy arrays.
 """
 
 
@@ -20,7 +40,15 @@ the 3D vectors found in a wavefront OBJ file.
 # sys.path.append(PATH-TO-THIS-FILE)
 # import vector as ...
 
+import os
 import math
+import mmap
+import warnings
+
+try:
+    import numpy as np
+except ImportError: # VectorArray needs numpy, Vector does not
+    np = None
 
 
 class Vector:
@@ -40,6 +68,9 @@ class Vector:
     unit():
         return a copy of the vector with unit size (i.e. its direction)
 
+    normalize():
+        Make the vector unit size, in place
+
     rotated(axis, angle):
         Return a copy of the vector rotated by 'angle' degrees about an
         axis vector (which must be unit).
@@ -48,6 +79,9 @@ class Vector:
         As above, but using user-computed cosine and sine of the angle.
         (May be more eficient when rotating lots of vectors).
 
+    rotate(axis, angle), rotate_ca(axis, cos, sin):
+        As rotated and rotated_ca, but rotate the vector in place.
+
     format(fmt):
         Return a user-formatted text representation of the vector
 
@@ -80,11 +114,23 @@ class Vector:
         U*3 -> Vector(3,6,9)
         U/2 -> Vector(0.5,1.0,1.5)
 
+    In-place arithmetic changes the vector itself, making no new one
+        e.g:
+        U = vec.Vector(1,2,3)
+        U += vec.Vector(1,1,1) -> U is Vector(2,3,4)
+        U *= 2                 -> U is Vector(4,6,8)
+    (so any other name for the same vector sees the change).
+
+    Vectors have __slots__, so they are small and hold only x, y and z.
+
     LoadObj(filename):
          Returns a list of the vectors found in a wavefront 'obj' file
     """
 
 
+    __slots__ = ('x','y','z')
+
+
     def __init__(self,x=0,y=0,z=0):
         """
     Creates a vector.
@@ -132,6 +178,38 @@ class Vector:
         return Vector(self.x-rhs.x, self.y-rhs.y, self.z-rhs.z)
 
 
+    def __imul__(self,s):
+        """In-place multiply by a scalar: self *= s."""
+        self.x*=s
+        self.y*=s
+        self.z*=s
+        return self
+
+
+    def __itruediv__(self,s):
+        """In-place divide by a scalar: self /= s."""
+        self.x/=s
+        self.y/=s
+        self.z/=s
+        return self
+
+
+    def __iadd__(self,rhs):
+        """In-place vector sum: self += rhs."""
+        self.x+=rhs.x
+        self.y+=rhs.y
+        self.z+=rhs.z
+        return self
+
+
+    def __isub__(self,rhs):
+        """In-place vector difference: self -= rhs."""
+        self.x-=rhs.x
+        self.y-=rhs.y
+        self.z-=rhs.z
+        return self
+
+
     def dot(self,rhs):
         """Return the scalar dot product of self and rhs.
     e.g:
@@ -173,7 +251,20 @@ class Vector:
     U.unit()   -> Vector(0.2672612419124244,0.5345224838248488,0.8017837257372732)
     U/U.norm() -> Vector(0.2672612419124244,0.5345224838248488,0.8017837257372732)
     """
-        return Vector(self.x,self.y,self.z) * (1/self.norm() )
+        s = 1/self.norm()
+        return Vector(self.x*s, self.y*s, self.z*s)
+
+
+    def normalize(self):
+        """Make the vector unit size, keeping its direction (in place, returns None).
+    e.g:
+    U = Vector(3,4,0)
+    U.normalize() -> U is Vector(0.6000000000000001,0.8,0.0)
+    """
+        s = 1/self.norm()
+        self.x*=s
+        self.y*=s
+        self.z*=s
 
 
     def rotated(self, Axis, angle):
@@ -188,18 +279,42 @@ class Vector:
     def rotated_ca(self, Axis, cos, sin):
         """As above, but using user-computed cosine and sine of the angle.
     """
-        size = self.norm()
+        x,y,z = self._rotation(Axis, cos, sin)
+        return Vector(x,y,z)
+
+
+    def rotate(self, Axis, angle):
+        """Rotate the vector about a unit axis vector (in place, returns None).
+    e.g:
+    U = Vector(1,0,0)
+    U.rotate(Vector(0,0,1), 90) -> U is Vector(6.123233995736766e-17,1.0,0.0)
+    """
+        a = angle * math.pi / 180
+        self.x,self.y,self.z = self._rotation(Axis, math.cos(a), math.sin(a))
+
+    def rotate_ca(self, Axis, cos, sin):
+        """As above, but using user-computed cosine and sine of the angle.
+    """
+        self.x,self.y,self.z = self._rotation(Axis, cos, sin)
+
+
+    def _rotation(self, Axis, cos, sin):
+        # the rotated components, as a tuple, making no Vectors on the way
+        x,y,z = self.x,self.y,self.z
         # rotating a zero-length vector is trivial
-        if 0==size:
-            return Vector()
-        P = Axis * self.dot(Axis) # Axis-parallel component
-        N = self-P                # Axis-normal component
-        T = N.X(Axis)             # T is normal to both Axis and N
+        if 0==x and 0==y and 0==z:
+            return 0,0,0
+        ax,ay,az = Axis.x,Axis.y,Axis.z
+        d = x*ax + y*ay + z*az
+        px,py,pz = ax*d, ay*d, az*d       # Axis-parallel component
+        nx,ny,nz = x-px, y-py, z-pz       # Axis-normal component
+        tx = ny*az - nz*ay                # T = N x Axis is normal
+        ty = nz*ax - nx*az                # to both Axis and N
+        tz = nx*ay - ny*ax
         # do a 2D rotation with N and T, preserving P
-        Rx = N.x*cos - sin*T.x + P.x;
-        Ry = N.y*cos - sin*T.y + P.y;
-        Rz = N.z*cos - sin*T.z + P.z;
-        return Vector(Rx,Ry,Rz)
+        return (nx*cos - sin*tx + px,
+                ny*cos - sin*ty + py,
+                nz*cos - sin*tz + pz)
 
 
 
@@ -219,6 +334,293 @@ class Vector:
 
 
 
+class VectorArray:
+    """A class to represent many 3-D vectors at once (needs numpy).
+
+    The vectors are kept in one 3 by N numpy array, xyz, so x, y and z
+    are each contiguous arrays. The methods are those of Vector, done
+    for every vector in one call, so a million vectors cost a few numpy
+    operations rather than a million method calls.
+
+    Methods:
+    --------
+    dot(rhs):
+        Return an array of the dot products with 'rhs'
+
+    X(rhs):
+        Return the (VectorArray) cross products with 'rhs'
+
+    norm():
+        Return an array of the vectors' norms
+
+    unit():
+        Return a copy with each vector divided by its size
+
+    normalize():
+        Divide each vector by its size, in place
+
+    rotated(axis, angle):
+        Return a copy with every vector rotated by 'angle' degrees
+        about a unit axis vector.
+
+    rotated_ca(axis, cos, sin):
+        As above, but using user-computed cosine and sine of the angle.
+
+    rotate(axis, angle), rotate_ca(axis, cos, sin):
+        As rotated and rotated_ca, but rotate the vectors in place.
+
+    tolist():
+        Return the vectors as a list of Vector
+
+    Broadcasting:
+    -------------
+    Wherever a method or operator takes another vector ('rhs', 'axis')
+    it may be a single Vector, used with every vector, or a VectorArray
+    of the same length, used pairwise. Scalars may be a number or an
+    array of N numbers, one per vector. The in-place operators
+    (+=, -=, *=, /=) change the arrays themselves.
+        e.g:
+        A = vec.MakeVectorArray([vec.Vector(1,2,3), vec.Vector(4,5,6)])
+        A+vec.Vector(1,1,1) -> VectorArray([Vector(2.0,3.0,4.0), Vector(5.0,6.0,7.0)])
+        A*2                 -> VectorArray([Vector(2.0,4.0,6.0), Vector(8.0,10.0,12.0)])
+        A.dot(vec.Vector(1,0,0)) -> array([1., 4.])
+    A single Vector must come second, e.g. A-V rather than V-A,
+    as Vector's own operators only know about Vectors.
+
+    Indexing:
+    ---------
+    len(A) is the number of vectors, A[i] is a Vector, and a slice,
+    e.g A[10:20], is a VectorArray (a view, sharing the arrays).
+    Iterating over A yields Vectors.
+    """
+
+
+    def __init__(self,x=(),y=(),z=()):
+        """
+    Creates a VectorArray.
+
+    Make N vectors from sequences (or arrays) of N x, y and z components.
+    The default, i.e. A=VectorArray() makes an empty array.
+    """
+        if np is None:
+            raise ImportError('VectorArray needs numpy.')
+        self.xyz = np.array([x,y,z],dtype=float)
+
+
+    @classmethod
+    def _wrap(cls,xyz):
+        # a VectorArray using the 3 by N array xyz, without copying it
+        A = cls.__new__(cls)
+        A.xyz = xyz
+        return A
+
+
+    @property
+    def x(self):
+        """The x components, an array."""
+        return self.xyz[0]
+
+    @property
+    def y(self):
+        """The y components, an array."""
+        return self.xyz[1]
+
+    @property
+    def z(self):
+        """The z components, an array."""
+        return self.xyz[2]
+
+
+    def __len__(self):
+        return self.xyz.shape[1]
+
+
+    def __getitem__(self,i):
+        """A[i] is a Vector; a slice or index array gives a VectorArray."""
+        if isinstance(i,(int,np.integer)):
+            x,y,z = self.xyz[:,i].tolist()
+            return Vector(x,y,z)
+        return VectorArray._wrap(self.xyz[:,i])
+
+
+    def __iter__(self):
+        for x,y,z in zip(*self.xyz.tolist()):
+            yield Vector(x,y,z)
+
+
+    def tolist(self):
+        """Return the vectors as a list of Vector."""
+        return [Vector(x,y,z) for x,y,z in zip(*self.xyz.tolist())]
+
+
+    def __pos__(self):
+        """    Unary plus, returns a copy of the VectorArray."""
+        return VectorArray._wrap(self.xyz.copy())
+
+    def __neg__(self):
+        """    Unary minus, returns a negated copy of the VectorArray."""
+        return VectorArray._wrap(-self.xyz)
+
+
+    def __mul__(self,s):
+        """Return the vectors post-multiplied by a scalar, or by an array of N scalars."""
+        return VectorArray._wrap(self.xyz*np.asarray(s))
+
+
+    def __rmul__(self,s):
+        """Return the vectors pre-multiplied by a scalar, or by an array of N scalars."""
+        return VectorArray._wrap(self.xyz*np.asarray(s))
+
+
+    def __truediv__(self,s):
+        """Return the vectors divided by a scalar, or by an array of N scalars."""
+        return VectorArray._wrap(self.xyz/np.asarray(s))
+
+
+    def __add__(self,rhs):
+        """Return the vector sums: self + rhs."""
+        return VectorArray._wrap(self.xyz+_Columns(rhs))
+
+
+    def __sub__(self,rhs):
+        """Return the vector differences: self - rhs."""
+        return VectorArray._wrap(self.xyz-_Columns(rhs))
+
+
+    def __imul__(self,s):
+        """In-place multiply by a scalar, or an array of N scalars: self *= s."""
+        self.xyz *= np.asarray(s)
+        return self
+
+
+    def __itruediv__(self,s):
+        """In-place divide by a scalar, or an array of N scalars: self /= s."""
+        self.xyz /= np.asarray(s)
+        return self
+
+
+    def __iadd__(self,rhs):
+        """In-place vector sums: self += rhs."""
+        self.xyz += _Columns(rhs)
+        return self
+
+
+    def __isub__(self,rhs):
+        """In-place vector differences: self -= rhs."""
+        self.xyz -= _Columns(rhs)
+        return self
+
+
+    def normalize(self):
+        """Make each vector unit size (in place, returns None)."""
+        self.xyz /= self.norm()
+
+
+    def dot(self,rhs):
+        """Return an array of the dot products of self and rhs.
+    e.g:
+    A = MakeVectorArray([Vector(1,2,3), Vector(4,5,6)])
+    A.dot(Vector(1,1,1)) -> array([ 6., 15.])
+    """
+        R = _Columns(rhs)
+        return self.xyz[0]*R[0] + self.xyz[1]*R[1] + self.xyz[2]*R[2]
+
+
+    def X(self,rhs):
+        """Return the vector cross products between self and rhs.
+    e.g:
+    A = MakeVectorArray([Vector(1,2,3)])
+    A.X(Vector(4,5,6)) -> VectorArray([Vector(-3.0,6.0,-3.0)])
+    """
+        x,y,z = self.xyz
+        u,v,w = _Columns(rhs)
+        return VectorArray._wrap(np.array([y*w - z*v, z*u - x*w, x*v - y*u]))
+
+
+    def norm(self):
+        """Return an array of the vectors' norms.
+    e.g:
+    A = MakeVectorArray([Vector(1,2,3), Vector(3,4,0)])
+    A.norm() -> array([3.74165739, 5.        ])
+    """
+        return np.sqrt(np.einsum('ij,ij->j',self.xyz,self.xyz))
+
+
+    def unit(self):
+        """Return the vectors' directions, i.e. each vector divided by its size.
+    (A zero vector gives nan, as Vector.unit() raises ZeroDivisionError.)
+    """
+        return VectorArray._wrap(self.xyz/self.norm())
+
+
+    def rotated(self, Axis, angle):
+        """Return the vectors rotated by angle degrees about a unit axis vector
+    (or about one axis each, if Axis is a VectorArray).
+    """
+        a = angle * math.pi / 180
+        return self.rotated_ca(Axis, math.cos(a), math.sin(a))
+
+    def rotated_ca(self, Axis, cos, sin):
+        """As above, but using user-computed cosine and sine of the angle.
+    cos and sin may also be arrays, one angle per vector.
+    """
+        A = _Columns(Axis)
+        V = self.xyz
+        P = A * (V[0]*A[0] + V[1]*A[1] + V[2]*A[2]) # Axis-parallel components
+        N = V-P                                     # Axis-normal components
+        # T = N x Axis is normal to both; a 2D rotation with N and T keeps P
+        T = np.array([N[1]*A[2] - N[2]*A[1], N[2]*A[0] - N[0]*A[2], N[0]*A[1] - N[1]*A[0]])
+        return VectorArray._wrap(N*cos - T*sin + P)
+
+    def rotate(self, Axis, angle):
+        """Rotate the vectors about a unit axis vector (in place, returns None)."""
+        self.xyz[:] = self.rotated(Axis, angle).xyz
+
+    def rotate_ca(self, Axis, cos, sin):
+        """As above, but using user-computed cosine and sine of the angle.
+    """
+        self.xyz[:] = self.rotated_ca(Axis, cos, sin).xyz
+
+
+
+    def __repr__(self):
+        """Return a text representation of the vectors (the first few if there are many)."""
+        if len(self)>6:
+            return 'VectorArray([{}, {}, {}, ... {:,d} vectors])'.format(*self[:3].tolist(),len(self))
+        return 'VectorArray([' + ', '.join(repr(V) for V in self) + '])'
+
+
+
+
+def _Columns(rhs):
+    # the 3 by N (or 3 by 1, for one Vector) components of rhs, for broadcasting
+    if isinstance(rhs,VectorArray):
+        return rhs.xyz
+    return np.array([[rhs.x],[rhs.y],[rhs.z]],dtype=float)
+
+
+def MakeVectorArray(Vectors):
+    """MakeVectorArray(Vectors)
+    Returns a new VectorArray holding copies of the vectors given.
+
+    Vectors is a list (or any sequence) of Vector, or an N by 3 array
+    of x,y,z rows, e.g. as numpy.loadtxt reads them.
+    e.g:
+       A = MakeVectorArray([Vector(1,2,3), Vector(4,5,6)])
+       A = MakeVectorArray(numpy.zeros((1000,3)))
+    A.tolist() turns a VectorArray back into a list of Vector.
+    """
+    if np is None:
+        raise ImportError('VectorArray needs numpy.')
+    if isinstance(Vectors,np.ndarray):
+        return VectorArray._wrap(np.array(Vectors,dtype=float).reshape(-1,3).T.copy())
+    n = len(Vectors)
+    flat = np.fromiter((c for V in Vectors for c in (V.x,V.y,V.z)),dtype=float,count=3*n)
+    return VectorArray._wrap(flat.reshape(n,3).T.copy())
+
+
+
+
 def MakeVector(text,sep=''):
     """MakeVector(text,sep='')
     Returns a new vector made from the string (str) argument.
@@ -278,17 +680,539 @@ def MakeDir(elevation,azimuth):
 
 
 
+#==========================================================
+#                      Rotations
+#==========================================================
+
+class Rotation:
+    """A class to represent a 3-D rotation, built once and applied many times.
+
+    A Rotation is held as a unit quaternion (w,x,y,z), and as the 3x3
+    matrix made from it when it is built, so applying it to a vector
+    costs nine multiplies, with no cosines or sines. Make one with
+    MakeRotation(axis, angle) or MakeDirRotation(elevation, azimuth);
+    Rotation() is the identity.
+
+    Methods:
+    --------
+    apply(V):
+        Return V rotated: V may be a Vector, a VectorArray (rotated with
+        one matrix multiply) or a list of Vectors
+
+    inverse():
+        Return the opposite rotation
+
+    matrix():
+        Return the 3x3 matrix, as three row tuples
+
+    quaternion():
+        Return the unit quaternion, (w,x,y,z)
+
+    axis_angle():
+        Return (axis, angle): the unit axis Vector and the angle in degrees
+
+    Special methods:
+    ----------------
+    R2*R1 is the rotation R1 followed by R2 (as with matrices), so
+    (R2*R1).apply(V) is R2.apply(R1.apply(V)), but costs one rotation.
+    See also ComposeRotations(Rotations).
+        e.g:
+        Rz = vec.MakeRotation(vec.Vector(0,0,1), 90)
+        Rz.apply(vec.Vector(1,0,0)) -> Vector(0.0,1.0,0.0) (to rounding)
+        (Rz*Rz).apply(vec.Vector(1,0,0)) -> Vector(-1.0,0.0,0.0) (to rounding)
+    """
+
+    __slots__ = ('q','m')
+
+
+    def __init__(self,w=1,x=0,y=0,z=0):
+        """
+    Creates a rotation from a quaternion, which is scaled to unit size.
+    The default, i.e. R=Rotation() makes the identity.
+    """
+        size = math.sqrt(w*w + x*x + y*y + z*z)
+        w,x,y,z = w/size, x/size, y/size, z/size
+        self.q = (w,x,y,z)
+        self.m = (1-2*(y*y+z*z),   2*(x*y-w*z),   2*(x*z+w*y),
+                    2*(x*y+w*z), 1-2*(x*x+z*z),   2*(y*z-w*x),
+                    2*(x*z-w*y),   2*(y*z+w*x), 1-2*(x*x+y*y))
+
+
+    def __mul__(self,rhs):
+        """Return the rotation rhs followed by self."""
+        a,b,c,d = self.q
+        e,f,g,h = rhs.q
+        return Rotation(a*e - b*f - c*g - d*h,
+                        a*f + b*e + c*h - d*g,
+                        a*g - b*h + c*e + d*f,
+                        a*h + b*g - c*f + d*e)
+
+
+    def inverse(self):
+        """Return the opposite rotation."""
+        w,x,y,z = self.q
+        return Rotation(w,-x,-y,-z)
+
+
+    def apply(self,V):
+        """Return V rotated; V may be a Vector, a VectorArray or a list of Vectors.
+    e.g:
+    R = MakeRotation(Vector(0,0,1), 90)
+    R.apply(Vector(1,2,3))           -> Vector(-2.0,1.0,3.0) (to rounding)
+    R.apply(MakeVectorArray(points)) -> the points rotated, one matrix multiply
+    """
+        m = self.m
+        if isinstance(V,Vector):
+            x,y,z = V.x,V.y,V.z
+            return Vector(m[0]*x + m[1]*y + m[2]*z,
+                          m[3]*x + m[4]*y + m[5]*z,
+                          m[6]*x + m[7]*y + m[8]*z)
+        if isinstance(V,VectorArray):
+            return VectorArray._wrap(np.dot(np.reshape(m,(3,3)),V.xyz))
+        return [self.apply(U) for U in V]
+
+
+    def matrix(self):
+        """Return the rotation matrix, as three row tuples."""
+        m = self.m
+        return (m[0:3],m[3:6],m[6:9])
+
+
+    def quaternion(self):
+        """Return the unit quaternion (w,x,y,z)."""
+        return self.q
+
+
+    def axis_angle(self):
+        """Return (axis, angle): the unit axis Vector and the angle in degrees.
+    The identity has axis Vector(0,0,1) and angle 0.
+    """
+        w,x,y,z = self.q
+        s = math.sqrt(x*x + y*y + z*z)
+        if 0==s:
+            return Vector(0,0,1),0.0
+        return Vector(x/s,y/s,z/s),2*math.atan2(s,w) * 180 / math.pi
+
+
+    def __repr__(self):
+        """Return a text representation of the rotation."""
+        return 'Rotation' + str(self.q)
+
+
+
+
+def MakeRotation(Axis,angle):
+    """MakeRotation(Axis,angle)
+    Returns a new Rotation by angle degrees about the axis vector,
+    turning the same way as Vector.rotated(Axis,angle).
+    (The axis need not be unit here.)
+    e.g:
+       R = MakeRotation(Vector(1,1,0), 30)
+       R.apply(V) -> V.rotated(Vector(1,1,0).unit(), 30)
+    """
+    a = angle * math.pi / 360 # half the angle, in radians
+    s = math.sin(a) / Axis.norm()
+    return Rotation(math.cos(a), Axis.x*s, Axis.y*s, Axis.z*s)
+
+
+def MakeDirRotation(elevation,azimuth):
+    """MakeDirRotation(elevation,azimuth) (both angles in degrees)
+    Returns a new Rotation turning the z-axis, i.e. MakeDir(0,0),
+    towards MakeDir(elevation,azimuth): up by elevation about the
+    x-axis, then round by azimuth about the y-axis.
+    e.g:
+       MakeDirRotation(30,45).apply(Vector(0,0,1)) -> MakeDir(30,45) (to rounding)
+    """
+    return MakeRotation(Vector(0,1,0),azimuth) * MakeRotation(Vector(1,0,0),-elevation)
+
+
+def ComposeRotations(Rotations):
+    """ComposeRotations(Rotations)
+    Returns the single Rotation doing each of the Rotations in turn,
+    the first one first.
+    e.g:
+       R = ComposeRotations([R1, R2, R3])
+       R.apply(A) -> R3.apply(R2.apply(R1.apply(A))), at the cost of one
+    """
+    R = Rotation()
+    for S in Rotations:
+        R = S*R
+    return R
+
+
+
+
+
+
+#==========================================================
+#                 Wavefront OBJ files
+#==========================================================
+# Both loaders parse a block of whole lines at a time, with numpy:
+# each line's keyword is read off its first bytes and blanked, the
+# bytes of the wanted records are picked out with a mask, and their
+# numbers are read in one np.fromstring call. Lines must start with
+# their keyword (no leading blanks), and a backslash does not continue
+# a line.
+
+OBJ_BLOCK = 1<<24 # bytes of whole lines parsed at a time
+OBJ_CHUNK = 1<<16 # vertices per VectorArray from StreamObj
+
+
+class ObjMesh:
+    """The records of a wavefront OBJ file, in numpy arrays (see ReadObj).
+
+    Attributes:
+    -----------
+    vertices:
+        VectorArray of the v records (x, y, z)
+
+    extra:
+        N by k array of any numbers after x y z on v lines (a weight, or
+        a colour), nan where a line has fewer; None if no line has any
+
+    normals:
+        VectorArray of the vn records
+
+    texcoords:
+        N by k array of the vt records (u, v, w as far as given, 0 after)
+
+    face_start:
+        M+1 offsets into the corner arrays: face i has corners
+        face_start[i] to face_start[i+1]-1
+
+    face_vertices, face_texcoords, face_normals:
+        each corner's vertex, texture coordinate and normal, as 0-based
+        indices into the arrays above, -1 where the f record gives none
+        (negative, i.e. relative, indices in the file are resolved)
+
+    Methods:
+    --------
+    face(i):
+        Return face i's vertex indices, a list
+
+    triangles():
+        Return a T by 3 array of vertex indices, splitting each face
+        into a fan of triangles
+    """
+
+
+    def __init__(self):
+        self.vertices = VectorArray()
+        self.extra = None
+        self.normals = VectorArray()
+        self.texcoords = np.zeros((0,2))
+        self.face_start = np.zeros(1,dtype=np.int64)
+        self.face_vertices = np.zeros(0,dtype=np.int64)
+        self.face_texcoords = np.zeros(0,dtype=np.int64)
+        self.face_normals = np.zeros(0,dtype=np.int64)
+
+
+    def __len__(self):
+        """The number of faces."""
+        return len(self.face_start)-1
+
+
+    def face(self,i):
+        """Return face i's vertex indices, a list."""
+        return self.face_vertices[self.face_start[i]:self.face_start[i+1]].tolist()
+
+
+    def triangles(self):
+        """Return a T by 3 array of vertex indices, each face split into a fan
+    of triangles around its first corner (faces with fewer than 3 corners
+    are left out).
+    """
+        sizes = np.diff(self.face_start)
+        per = np.maximum(sizes-2,0)           # triangles per face
+        first = np.repeat(self.face_start[:-1],per)
+        k = np.arange(per.sum()) - np.repeat(np.cumsum(per)-per,per) # which triangle of its face
+        fv = self.face_vertices
+        return np.stack([fv[first],fv[first+k+1],fv[first+k+2]],axis=1)
+
+
+    def __repr__(self):
+        return 'ObjMesh({:,d} vertices, {:,d} normals, {:,d} texcoords, {:,d} faces)'.format(
+               len(self.vertices),len(self.normals),len(self.texcoords),len(self))
+
+
+
+
+class _ObjBlock:
+    # a block of whole OBJ lines as a byte array, with each line's
+    # keyword blanked out and its kind of record noted
+
+    V,VN,VT,F = 1,2,3,4
+
+    def __init__(self,block):
+        a = np.frombuffer(block+b'\n\n',dtype=np.uint8) # room to look past the last line
+        ends = np.flatnonzero(a[:-2]==10)
+        starts = np.concatenate(([0],ends[:-1]+1))
+        c0,c1,c2 = a[starts],a[starts+1],a[starts+2]
+        kind = np.zeros(len(starts),dtype=np.uint8)
+        kind[(c0==118) & (c1<=32)] = self.V                 # 'v '
+        kind[(c0==118) & (c1==110) & (c2<=32)] = self.VN    # 'vn '
+        kind[(c0==118) & (c1==116) & (c2<=32)] = self.VT    # 'vt '
+        kind[(c0==102) & (c1<=32)] = self.F                 # 'f '
+        self.kind = kind
+        self.starts = starts
+        self.lengths = ends-starts+1
+        b = a[:-2].copy()
+        b[starts[kind!=0]] = 32                             # blank the keywords
+        b[starts[(kind==self.VN) | (kind==self.VT)]+1] = 32
+        hashes = np.flatnonzero(b==35)                      # and any comments
+        lines = np.searchsorted(ends,hashes)
+        for h,line in zip(hashes[kind[lines]!=0].tolist(),lines[kind[lines]!=0].tolist()):
+            b[h:ends[line]] = 32
+        self.b = b
+        self.ByteKind = None
+
+    def Count(self,kind):
+        return int((self.kind==kind).sum())
+
+    def Bytes(self,kind):
+        # the bytes of the lines of kind, the starts of their tokens,
+        # and how many tokens each line has
+        if self.ByteKind is None:
+            self.ByteKind = np.repeat(self.kind,self.lengths)
+        sub = self.b[self.ByteKind==kind]
+        blank = sub<=32
+        token = ~blank
+        token[1:] &= blank[:-1]
+        tokens = np.flatnonzero(token)
+        return sub,tokens,_Within(tokens,np.cumsum(self.lengths[self.kind==kind]))
+
+    def Numbers(self,kind,dtype=float):
+        # the numbers on the lines of kind, flat, and how many on each
+        sub,tokens,counts = self.Bytes(kind)
+        return _Parse(sub.tobytes(),dtype,len(tokens)),counts
+
+    def Faces(self,base):
+        # the f records: corners per face, and each corner's (v,vt,vn) as
+        # 1-based or negative file indices, 0 for none; base holds the
+        # (v,vt,vn) counts before this block, to resolve negative indices
+        sub,tokens,corners = self.Bytes(self.F)
+        C = len(tokens)
+        if 0==C:
+            return corners,np.zeros((0,3),dtype=np.int64)
+        # the slashes, and double slashes, in each corner
+        slash = sub==47
+        ends = np.append(tokens[1:],len(sub))
+        S = _Within(np.flatnonzero(slash),ends)
+        slash[:-1] &= slash[1:]
+        D = _Within(np.flatnonzero(slash),ends)
+        Cols = {(0,0):(0,),      # v
+                (1,0):(0,1),     # v/vt
+                (2,1):(0,2),     # v//vn
+                (2,0):(0,1,2),   # v/vt/vn
+                }.get((int(S[0]),int(D[0])))
+        if Cols is None or (S!=S[0]).any() or (D!=D[0]).any():
+            Index = self.MixedFaces(sub,C)
+        else:
+            sub[sub==47] = 32
+            Index = np.zeros((C,3),dtype=np.int64)
+            Index[:,Cols] = _Parse(sub.tobytes(),np.int64,C*len(Cols)).reshape(C,len(Cols))
+        if (Index<0).any():
+            # a negative index counts back from the records so far
+            before = np.stack([np.cumsum(self.kind==k) for k in (self.V,self.VT,self.VN)],axis=1)+base
+            before = np.repeat(before[self.kind==self.F],corners,axis=0)
+            Index = np.where(Index<0,Index+before+1,Index)
+        return corners,Index
+
+    def MixedFaces(self,sub,C):
+        # faces mixing corner formats, one corner at a time
+        Index = np.zeros((C,3),dtype=np.int64)
+        for k,corner in enumerate(sub.tobytes().split()):
+            for j,text in enumerate(corner.split(b'/')[:3]):
+                if text:
+                    Index[k,j] = int(text)
+        return Index
+
+
+def _Within(positions,ends):
+    # how many of the sorted positions fall in each of the ranges
+    # [0,ends[0]), [ends[0],ends[1]) ...
+    return np.diff(np.searchsorted(positions,ends),prepend=0)
+
+
+def _Parse(text,dtype,count):
+    # count numbers of dtype from whitespace separated text
+    if 0==count:
+        return np.zeros(0,dtype=dtype)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore') # a short read is reported below
+        try:
+            values = np.fromstring(text,dtype=dtype,sep=' ')
+        except ValueError:
+            values = ()
+    if len(values)!=count:
+        raise ValueError('bad number in an OBJ record')
+    return values
+
+
+def _Rows(values,counts,fill=0.0):
+    # values as rows, counts[i] of them in row i, padded with fill
+    n = len(counts)
+    width = int(counts.max()) if n else 0
+    if n and (counts==width).all():
+        return values.reshape(n,width)
+    R = np.full((n,width),fill)
+    row = np.repeat(np.arange(n),counts)
+    R[row,np.arange(len(values))-np.repeat(np.cumsum(counts)-counts,counts)] = values
+    return R
+
+
+def _Blocks(file,size):
+    # the file, read as blocks of whole lines, each ending in a newline
+    rest = b''
+    while True:
+        data = file.read(size)
+        if not data:
+            break
+        data = rest+data
+        end = data.rfind(b'\n')+1
+        rest = data[end:]
+        if end:
+            yield data[:end]
+    if rest:
+        yield rest+b'\n'
+
+
+def _Vertices(B):
+    # the block's v records as an N by 3 array, and the extra numbers
+    # on their lines, N by k (None if none)
+    values,counts = B.Numbers(B.V)
+    if 0==len(counts):
+        return np.zeros((0,3)),None
+    if counts.min()<3:
+        raise ValueError('an OBJ v record needs x, y and z')
+    R = _Rows(values,counts,math.nan)
+    return R[:,:3],(R[:,3:] if R.shape[1]>3 else None)
+
+
+def StreamObj(filename,chunk=OBJ_CHUNK,block=OBJ_BLOCK):
+    """StreamObj(filename,chunk=OBJ_CHUNK,block=OBJ_BLOCK) (needs numpy)
+    Yields the vertices (v records) of a wavefront OBJ file in order,
+    as VectorArrays of chunk vertices each (the last may be shorter).
+
+    The file is read block bytes at a time, so memory use stays about
+    block + chunk vertices whatever the size of the file.
+    e.g:
+       for A in StreamObj('scan.obj'):
+           total += A.norm().sum()
+    """
+    if np is None:
+        raise ImportError('StreamObj needs numpy.')
+    Parts = []
+    held = 0
+    with open(filename,'rb') as file:
+        for data in _Blocks(file,block):
+            P,extra = _Vertices(_ObjBlock(data))
+            Parts.append(P)
+            held += len(P)
+            while held>=chunk:
+                P = np.concatenate(Parts) if len(Parts)>1 else Parts[0]
+                yield VectorArray._wrap(P[:chunk].T.copy())
+                Parts = [P[chunk:]]
+                held -= chunk
+    if held:
+        yield VectorArray._wrap(np.concatenate(Parts).T.copy())
+
+
+def ReadObj(filename,block=OBJ_BLOCK):
+    """ReadObj(filename,block=OBJ_BLOCK) (needs numpy)
+    Returns an ObjMesh holding the v, vn, vt and f records of a
+    wavefront OBJ file in numpy arrays.
+
+    The file is memory mapped and parsed block bytes at a time, so only
+    the arrays and one block are held. Other records (o, g, usemtl,
+    comments ...) are skipped.
+    e.g:
+       M = ReadObj('scan.obj')
+       M.vertices.norm().max()  -> the furthest vertex's distance
+       M.triangles()            -> the faces as triangles of vertex indices
+    """
+    if np is None:
+        raise ImportError('ReadObj needs numpy.')
+    V,Extra,N,T,Corners,Index = [],[],[],[],[],[]
+    base = np.zeros(3,dtype=np.int64) # v, vt, vn records so far
+    with open(filename,'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        data = mmap.mmap(file.fileno(),0,access=mmap.ACCESS_READ) if size else b''
+        try:
+            start = 0
+            while start<size:
+                end = data.rfind(b'\n',start,start+block)+1 if start+block<size else size
+                if end<=start: # a line longer than block
+                    end = data.find(b'\n',start+block)+1 or size
+                chunk = data[start:end]
+                start = end
+                if not chunk.endswith(b'\n'):
+                    chunk += b'\n'
+                B = _ObjBlock(chunk)
+                P,extra = _Vertices(B)
+                V.append(P)
+                Extra.append(extra)
+                if B.Count(B.VN):
+                    values,counts = B.Numbers(B.VN)
+                    if (counts!=3).any():
+                        raise ValueError('an OBJ vn record needs exactly x, y and z')
+                    N.append(values.reshape(-1,3))
+                if B.Count(B.VT):
+                    values,counts = B.Numbers(B.VT)
+                    T.append(_Rows(values,counts))
+                if B.Count(B.F):
+                    corners,I = B.Faces(base)
+                    Corners.append(corners)
+                    Index.append(I)
+                base += [len(P),B.Count(B.VT),B.Count(B.VN)]
+        finally:
+            if size:
+                data.close()
+
+    Mesh = ObjMesh()
+    if V:
+        Mesh.vertices = VectorArray._wrap(np.concatenate(V).T.copy())
+        if any(E is not None for E in Extra):
+            width = max(E.shape[1] for E in Extra if E is not None)
+            Mesh.extra = np.full((len(Mesh.vertices),width),math.nan)
+            row = 0
+            for P,E in zip(V,Extra):
+                if E is not None:
+                    Mesh.extra[row:row+len(P),:E.shape[1]] = E
+                row += len(P)
+    if N:
+        Mesh.normals = VectorArray._wrap(np.concatenate(N).T.copy())
+    if T:
+        width = max(R.shape[1] for R in T)
+        Mesh.texcoords = np.concatenate([np.pad(R,((0,0),(0,width-R.shape[1]))) for R in T])
+    if Index:
+        Index = np.concatenate(Index)
+        low,high = Index.min(axis=0),Index.max(axis=0)
+        if (high>base).any() or low[0]<1 or (low[1:]<0).any():
+            raise ValueError('an OBJ face refers to a record that does not exist')
+        Mesh.face_start = np.concatenate(([0],np.cumsum(np.concatenate(Corners))))
+        Mesh.face_vertices = Index[:,0]-1
+        Mesh.face_texcoords = Index[:,1]-1
+        Mesh.face_normals = Index[:,2]-1
+    return Mesh
+
 
 def LoadObj(filename):
-    """MakeVector(text,sep='')
+    """LoadObj(filename)
     Returns a list of the vectors found in a wavefront OBJ file
+    (its v records; any numbers after x y z are ignored).
+    See StreamObj and ReadObj for big files, and for the other records.
     """
+    if np is not None:
+        VectorList = []
+        for A in StreamObj(filename):
+            VectorList.extend(A.tolist())
+        return VectorList
     VectorList = []
     with open(filename) as file:
         for line in file:
             if not line.startswith('v '):
                 continue
-            line=line[2:]
-            x,y,z = line.split()
-            VectorList.append(vector( float(x), float(y), float(z) ))
+            x,y,z = line[2:].split('#')[0].split()[:3]
+            VectorList.append(Vector( float(x), float(y), float(z) ))
     return VectorList